@@ -0,0 +1,174 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from tiny.generate import ProgramGenerator
+from tiny.lex import *
+from tiny.parse import *
+from tiny.emit import *
+from tiny.cgen import *
+from tiny.compiler import *
+from tiny.nodes import *
+
+# Compiler throughput benchmarks.
+# generates a program, times each phase on it (best of --repeat runs) and
+# prints rates. --output saves them as json, and they are compared with
+# the baseline json so a rate that drops more than --threshold fails.
+#
+#   python bench.py                      run and compare with the baseline
+#   python bench.py --save-baseline      run and make that the baseline
+
+baselinePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+def main():
+    argParser = argparse.ArgumentParser(prog="bench")
+    argParser.add_argument("--seed", type=int, default=1)
+    argParser.add_argument("--statements", type=int, default=5000,
+        help="size of the generated program (default: %(default)s)")
+    argParser.add_argument("--repeat", type=int, default=5,
+        help="runs of each benchmark, the best counts (default: %(default)s)")
+    argParser.add_argument("--output", metavar="FILE", help="save the results as json")
+    argParser.add_argument("--baseline", metavar="FILE", default=baselinePath,
+        help="results to compare with (default: bench_baseline.json)")
+    argParser.add_argument("--save-baseline", action="store_true",
+        help="save the results as the baseline instead of comparing")
+    argParser.add_argument("--threshold", type=float, default=0.25,
+        help="how much slower than the baseline is a regression (default: %(default)s)")
+    args = argParser.parse_args()
+
+    source = ProgramGenerator(args.seed, args.statements).program()
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "statements": args.statements,
+        "benchmarks": runBenchmarks(source, args.repeat),
+    }
+    for name, result in results["benchmarks"].items():
+        print("%-16s %12.0f %-12s %8.3fs" % (name, result["rate"], result["unit"], result["seconds"]))
+
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, args.baseline)
+        return
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+def save(results, path):
+    with open(path, "w") as outputFile:
+        json.dump(results, outputFile, indent=2)
+        outputFile.write("\n")
+
+
+# name -> {"seconds", "rate", "unit"} for every benchmark
+def runBenchmarks(source, repeat):
+    results = {}
+    directory = tempfile.mkdtemp()
+    sourcePath = os.path.join(directory, "bench.tiny")
+    with open(sourcePath, "w") as sourceFile:
+        sourceFile.write(source)
+
+    # lexers, tokens/s
+    for name, lexer in lexers.items():
+        seconds, count = best(repeat, lambda: lexAll(lexer(source)))
+        results["lex." + name] = result(seconds, count, "tokens/s")
+
+    # parser alone on already lexed tokens, statements/s
+    lexer = Lexer(source)
+    tokens = tokenList(lexer)
+    seconds, program = best(repeat, lambda: Parser(ReplayLexer(tokens, lexer)).program())
+    count = sum(1 for _ in walk(program.statements))
+    results["parse"] = result(seconds, count, "statements/s")
+
+    # C generation and writing it out, bytes/s
+    outputPath = os.path.join(directory, "bench.c")
+    def emitC():
+        emitter = Emitter(outputPath)
+        CGenerator(emitter).program(program)
+        emitter.writeFile()
+        return os.path.getsize(outputPath)
+    seconds, size = best(repeat, emitC)
+    results["emit"] = result(seconds, size, "bytes/s")
+
+    # whole compiles, source lines/s
+    lines = source.count("\n")
+    seconds, _ = best(repeat, lambda: compileFile(sourcePath, outputPath, Options()))
+    results["compile"] = result(seconds, lines, "lines/s")
+    seconds, _ = best(repeat, lambda: compileFile(sourcePath, outputPath, Options(optimize=True)))
+    results["compile.O"] = result(seconds, lines, "lines/s")
+
+    for path in (sourcePath, outputPath):
+        os.remove(path)
+    os.rmdir(directory)
+    return results
+
+
+# fastest of repeat runs of function, and what it returned. the collector
+# is off while timing, as timeit does, so its pauses don't land at random
+def best(repeat, function):
+    fastest = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            value = function()
+            seconds = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if fastest is None or seconds < fastest:
+            fastest = seconds
+    return fastest, value
+
+def result(seconds, count, unit):
+    return {"seconds": seconds, "rate": count / seconds, "unit": unit}
+
+
+# number of tokens lexer gives up to EOF
+def lexAll(lexer):
+    count = 0
+    getToken = lexer.getToken
+    while getToken().kind != TokenType.EOF:
+        count += 1
+    return count
+
+# every token lexer gives, EOF included
+def tokenList(lexer):
+    tokens = [lexer.getToken()]
+    while tokens[-1].kind != TokenType.EOF:
+        tokens.append(lexer.getToken())
+    return tokens
+
+
+# print how each benchmark did against the baseline, true if any got slower
+# by more than threshold
+def compare(results, baseline, threshold):
+    regressed = False
+    if baseline.get("statements") != results["statements"] or baseline.get("seed") != results["seed"]:
+        print("baseline is for a different program, not comparing")
+        return False
+    for name, current in results["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            continue
+        change = current["rate"] / old["rate"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print("%-16s %+7.1f%% vs baseline%s" % (name, change * 100, flag))
+    return regressed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import os
+import socket
+import sys
+
+# Thin client for the compile server, takes the same arguments as
+# teenytiny.py. it only imports what it needs to talk to the socket, so
+# starting it is quick. "run" reads the terminal so it, and anything when
+# no server is listening, runs teenytiny.py here instead
+
+def main():
+    argv = sys.argv[1:]
+    path = os.environ.get("TEENYTINY_SOCKET",
+        os.path.join("/tmp", "teenytiny-" + str(os.getuid()) + ".sock"))
+
+    connection = None
+    if argv[:1] != ["run"]:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            connection.close()
+            connection = None
+    if connection is None:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "teenytiny.py")
+        os.execv(sys.executable, [sys.executable, script] + argv)
+
+    # the settings the compiler reads, $CC picks the C compiler for --exe
+    environment = {name: value for name, value in os.environ.items()
+        if name.startswith("TEENYTINY_") or name == "CC"}
+    request = {"argv": argv, "cwd": os.getcwd(), "env": environment}
+    with connection:
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            data = connection.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+
+    reply = json.loads(b"".join(chunks))
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    sys.exit(reply["status"])
+
+
+main()
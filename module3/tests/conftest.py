@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import the compiler package from module3
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,17 @@
+import pytest
+from tiny.batch import *
+
+
+# an input that crashes the compiler fails on its own, the files around
+# it still compile
+@pytest.mark.parametrize("workers", [1, 2])
+def test_crash_fails_one_file(tmp_path, workers):
+    (tmp_path / "a.tiny").write_text('PRINT "a"\n')
+    (tmp_path / "b.tiny").write_text("IF 1 > 0 THEN\n" * 5000 + "ENDIF\n" * 5000)
+    (tmp_path / "c.tiny").write_text('PRINT "c"\n')
+    jobs = batchJobs([str(tmp_path)], None, ".c")
+    results = dict(compileBatch(jobs, Options(), workers))
+    assert results[str(tmp_path / "a.tiny")] is None
+    assert results[str(tmp_path / "b.tiny")].startswith("RecursionError")
+    assert results[str(tmp_path / "c.tiny")] is None
+    assert (tmp_path / "c.c").exists()
@@ -0,0 +1,60 @@
+import glob
+import io
+import os
+from tiny.cache import *
+
+
+def entrySizes(directory):
+    return [os.path.getsize(path) for path in glob.glob(os.path.join(str(directory), '??', '*'))]
+
+
+# storing keeps the cache under its size, dropping the oldest entries
+def test_store_evicts_oldest(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), maxSize=350)
+    source = tmp_path / "out.c"
+    source.write_bytes(b"x" * 100)
+    names = [cache.key(io.BytesIO(str(number).encode()), "") for number in range(6)]
+    for name in names:
+        cache.store(name, str(source))
+    assert sum(entrySizes(tmp_path / "cache")) <= 350
+    assert cache.fetch(names[-1], str(tmp_path / "fetched.c"))
+    assert not cache.fetch(names[0], str(tmp_path / "fetched.c"))
+
+
+# under its size, a store doesn't scan the cache, except to count a cache
+# with no running total and every RESCAN_STORES stores
+def test_store_scans_rarely(tmp_path, monkeypatch):
+    scans = []
+    cache = CompileCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(CompileCache.evict(cache)))
+    source = tmp_path / "out.c"
+    source.write_bytes(b"x" * 100)
+    for number in range(RESCAN_STORES + 2):
+        cache.store(cache.key(io.BytesIO(str(number).encode()), ""), str(source))
+    assert len(scans) == 2
+
+
+# storing an entry again counts only the change in its size
+def test_restore_counts_difference(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"), maxSize=250)
+    source = tmp_path / "out.c"
+    name = cache.key(io.BytesIO(b""), "")
+    for size in (100, 200, 200, 200):
+        source.write_bytes(b"x" * size)
+        cache.store(name, str(source))
+    assert cache.fetch(name, str(tmp_path / "fetched.c"))
+
+
+# a source is hashed a chunk at a time, all of it
+def test_key_reads_in_chunks(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"))
+    reads = []
+    class Source(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+    data = b"x" * (3 * HASH_CHUNK + 1)
+    name = cache.key(Source(data), "")
+    assert reads and all(0 < size <= HASH_CHUNK for size in reads)
+    assert cache.key(io.BytesIO(data[:-1] + b"y"), "") != name
+    assert cache.key(io.BytesIO(data), "") == name
@@ -0,0 +1,86 @@
+import shutil
+import subprocess
+import pytest
+from tiny.compiler import *
+
+pytestmark = pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+
+program = """LET a = 7
+LET b = 7
+INPUT a
+INPUT b
+PRINT a
+PRINT b
+"""
+
+# the same program reading with scanf, for a float or a long
+reference = r"""#include <stdio.h>
+int main(void) {
+    %(type)s a = 7, b = 7;
+    if (scanf("%(format)s", &a) == 0) {
+        a = 0;
+        scanf("%%*s");
+    }
+    if (scanf("%(format)s", &b) == 0) {
+        b = 0;
+        scanf("%%*s");
+    }
+    printf("%%.2f\n%%.2f\n", (float)a, (float)b);
+    return 0;
+}
+"""
+
+# input is read 64 KB at a time
+block = 65536
+
+# input and what the float program prints for it
+inputs = [
+    # at the end of input the variables are left alone
+    ("", "7.00\n7.00\n"),
+    ("3", "3.00\n7.00\n"),
+    # a word that isn't a number reads as 0 and is skipped
+    ("abc 5\n", "0.00\n5.00\n"),
+    ("-x 1e1", "0.00\n10.00\n"),
+    # a number and a word split between two blocks
+    (" " * (block - 3) + "123456 2.5e1\n", "123456.00\n25.00\n"),
+    ("x" * (block - 1) + "y 42", "0.00\n42.00\n"),
+    ("1" * (block - 2) + " 8", "inf\n8.00\n"),
+]
+
+# what the executable built from source prints reading input from a file,
+# which read() fills whole blocks from
+def runWith(tmp_path, executable, input):
+    inputPath = tmp_path / "input.txt"
+    inputPath.write_text(input)
+    with open(inputPath) as inputFile:
+        return subprocess.run([executable], stdin=inputFile, capture_output=True, text=True, check=True).stdout
+
+def buildReference(tmp_path, type, format):
+    sourcePath = tmp_path / "reference.c"
+    sourcePath.write_text(reference % {"type": type, "format": format})
+    executable = str(tmp_path / "reference")
+    subprocess.run(["cc", "-w", "-o", executable, str(sourcePath)], check=True)
+    return executable
+
+def buildProgram(tmp_path, **options):
+    sourcePath = tmp_path / "program.tiny"
+    sourcePath.write_text(program)
+    executable = str(tmp_path / "program")
+    compileFile(str(sourcePath), executable, Options(exe=executable, **options))
+    return executable
+
+
+@pytest.mark.parametrize("input, output", inputs)
+def test_float_input(tmp_path, input, output):
+    printed = runWith(tmp_path, buildProgram(tmp_path), input)
+    assert printed == output
+    assert printed == runWith(tmp_path, buildReference(tmp_path, "float", "%f"), input)
+
+
+# with --int-input the variables are longs read like scanf("%ld")
+@pytest.mark.parametrize("input", [input for input, output in inputs])
+def test_long_input(tmp_path, input):
+    executable = buildProgram(tmp_path, optimize=True, int_input=True)
+    compileFile(str(tmp_path / "program.tiny"), str(tmp_path / "program.c"), Options(optimize=True, int_input=True))
+    assert "long a;" in (tmp_path / "program.c").read_text()
+    assert runWith(tmp_path, executable, input) == runWith(tmp_path, buildReference(tmp_path, "long", "%ld"), input)
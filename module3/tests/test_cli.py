@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+moduleDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# prints the modules loaded by running teenytiny.py with the arguments after it
+loadedModules = """import os, runpy, sys
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name="__main__")
+print(" ".join(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+# a plain one-file compile only loads the lexer, parser and C generator,
+# not argparse or anything for the optimizer, bytecode, cache or server
+def test_one_file_compile_loads_little(tmp_path):
+    result = subprocess.run([sys.executable, "-c", loadedModules,
+        os.path.join(moduleDirectory, "teenytiny.py"), os.path.join(moduleDirectory, "fib.tiny")],
+        cwd=tmp_path, env=dict(os.environ, TEENYTINY_CACHE=""), capture_output=True, text=True, check=True)
+    modules = set(result.stderr.split())
+    assert {name for name in modules if name.split(".")[0] == "tiny"} == {"tiny", "tiny.cli",
+        "tiny.compiler", "tiny.lex", "tiny.parse", "tiny.emit", "tiny.cgen", "tiny.cinput",
+        "tiny.nodes", "tiny.values", "tiny.colors"}
+    assert "argparse" not in modules
+    assert (tmp_path / "out.c").exists()
@@ -0,0 +1,112 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+from tiny.compiler import *
+from tiny.vm import Bytecode
+
+moduleDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# chains of a few thousand terms, far deeper than the recursion limit
+terms = 3000
+chainProgram = ("INPUT a\n"
+    "LET b = a" + " + a - 1" * terms + "\n"
+    "PRINT b\n"
+    "PRINT b" + " * a / a" * terms + "\n"
+    "IF b" + " - a" * terms + " < 0 THEN\n"
+    "PRINT 1\n"
+    "ENDIF\n")
+chainOutput = "3002.00\n3002.00\n1.00\n"
+
+
+# what teenytiny run prints for source on engine
+def runEngine(tmp_path, source, engine, *options, input=""):
+    sourcePath = tmp_path / "program.tiny"
+    sourcePath.write_text(source)
+    return subprocess.run([sys.executable, os.path.join(moduleDirectory, "teenytiny.py"), "run",
+        "--engine", engine, *options, str(sourcePath)],
+        input=input, capture_output=True, text=True, check=True).stdout
+
+
+@pytest.mark.parametrize("engine", ["closure", "vm", "python"])
+@pytest.mark.parametrize("options", [[], ["-O"]])
+def test_long_chains_run(tmp_path, engine, options):
+    assert runEngine(tmp_path, chainProgram, engine, *options, input="2\n") == chainOutput
+
+
+# compiling to C or bytecode, with and without the optimizer
+@pytest.mark.parametrize("options", [{}, {"optimize": True}, {"optimize": True, "int_input": True}])
+def test_long_chains_compile(tmp_path, options):
+    sourcePath = tmp_path / "program.tiny"
+    sourcePath.write_text(chainProgram)
+    compileFile(str(sourcePath), str(tmp_path / "out.c"), Options(**options))
+    compileFile(str(sourcePath), str(tmp_path / "out.ttb"), Options(bytecode=True, **options))
+    if shutil.which("cc") is not None:
+        executable = str(tmp_path / "program")
+        compileFile(str(sourcePath), executable, Options(exe=executable, **options))
+        assert subprocess.run([executable], input="2\n", capture_output=True, text=True).stdout == chainOutput
+
+
+# the sample programs with input for them, hello.tiny is there to show an
+# error so it is only checked for that
+samples = [("fib.tiny", "10\n"), ("avg.tiny", "3\n1\n2\n4\n")]
+
+# what the sample prints built with the C compiler
+def builtOutput(tmp_path, sample, input):
+    executable = str(tmp_path / "reference")
+    compileFile(os.path.join(moduleDirectory, sample), executable, Options(exe=executable))
+    return subprocess.run([executable], input=input, capture_output=True, text=True, check=True).stdout
+
+
+# each engine prints what the C does, with and without the optimizer
+@pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+@pytest.mark.parametrize("engine", ["closure", "vm", "python"])
+@pytest.mark.parametrize("options", [[], ["-O"]])
+@pytest.mark.parametrize("sample, input", samples)
+def test_samples_match_c(tmp_path, engine, options, sample, input):
+    with open(os.path.join(moduleDirectory, sample)) as sourceFile:
+        source = sourceFile.read()
+    assert runEngine(tmp_path, source, engine, *options, input=input) == builtOutput(tmp_path, sample, input)
+
+
+# bytecode saved to a .ttb file loads back the same and runs from the file
+# the way the C does
+@pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("sample, input", samples)
+def test_bytecode_file_round_trip(tmp_path, optimize, sample, input):
+    bytecodePath = tmp_path / "program.ttb"
+    compileFile(os.path.join(moduleDirectory, sample), str(bytecodePath),
+        Options(bytecode=str(bytecodePath), optimize=optimize))
+    with open(bytecodePath, "rb") as bytecodeFile:
+        bytecode = Bytecode.load(bytecodeFile)
+    saved = io.BytesIO()
+    bytecode.save(saved)
+    assert saved.getvalue() == bytecodePath.read_bytes()
+
+    result = subprocess.run([sys.executable, os.path.join(moduleDirectory, "teenytiny.py"), "run",
+        str(bytecodePath)], input=input, capture_output=True, text=True, check=True)
+    assert result.stdout == builtOutput(tmp_path, sample, input)
+
+# a .ttb from another version of the format isn't run
+def test_bytecode_version_checked(tmp_path):
+    bytecodePath = tmp_path / "program.ttb"
+    compileFile(os.path.join(moduleDirectory, "fib.tiny"), str(bytecodePath), Options(bytecode=str(bytecodePath)))
+    data = bytearray(bytecodePath.read_bytes())
+    data[4] += 1
+    with pytest.raises(ValueError):
+        Bytecode.load(io.BytesIO(bytes(data)))
+
+# the engines give the same error for hello.tiny as compiling it does
+@pytest.mark.parametrize("engine", ["closure", "vm", "python"])
+def test_error_sample(tmp_path, engine):
+    source = os.path.join(moduleDirectory, "hello.tiny")
+    with pytest.raises(SystemExit) as exit:
+        compileFile(source, str(tmp_path / "out.c"), Options())
+    result = subprocess.run([sys.executable, os.path.join(moduleDirectory, "teenytiny.py"), "run",
+        "--engine", engine, source], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stderr == exit.value.code + "\n"
+    assert "undeclared label: bob" in result.stderr
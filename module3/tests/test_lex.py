@@ -0,0 +1,43 @@
+import io
+import pytest
+from tiny.compiler import *
+
+
+# the last token lexer gives for source, EOF
+def lastToken(lexer):
+    while True:
+        token = lexer.getToken()
+        if token.kind == TokenType.EOF:
+            return token
+
+
+# EOF is at the end of the last line of the file, with or without a
+# newline ending it, for every lexer and however the compact lexer reads
+@pytest.mark.parametrize("makeLexer", [
+    Lexer,
+    RegexLexer,
+    CompactLexer,
+    lambda source: CompactLexer(source, chunkSize=4),
+    lambda source: CompactLexer(io.StringIO(source), chunkSize=4),
+    lambda source: CompactLexer(io.BytesIO(source.encode()), chunkSize=4),
+], ids=["char", "regex", "compact", "compact.chunks", "compact.text", "compact.bytes"])
+@pytest.mark.parametrize("source, location", [
+    ("", (1, 1)),
+    ("\n", (1, 1)),
+    ("PRINT 1", (1, 8)),
+    ("PRINT 1\n", (1, 8)),
+    ("IF 1 > 0 THEN\nPRINT 12\n", (2, 9)),
+    ("LET a = 1\n\n", (2, 1)),
+    ("LET a = 1\n# done", (2, 7)),
+])
+def test_eof_location(makeLexer, source, location):
+    lexer = makeLexer(source)
+    assert lexer.location(lastToken(lexer)) == location
+
+
+# a missing ENDIF is reported at the end of the file, not past it
+@pytest.mark.parametrize("lexer", sorted(lexers))
+def test_missing_endif_location(lexer):
+    with pytest.raises(SystemExit) as exit:
+        Parser(lexers[lexer]("IF 1 > 0 THEN\nPRINT 1\n")).program()
+    assert "Error on line 2, column 8:" in exit.value.code
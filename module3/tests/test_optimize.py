@@ -0,0 +1,282 @@
+import io
+import os
+import shutil
+import subprocess
+import pytest
+from tiny.compiler import *
+from tiny.optimize import *
+from tiny.closure import ClosureEngine
+
+# nans from 0 / 0 and inf * nan, negated and mixed into other math
+nanProgram = """LET z = 0
+LET n = z / z
+LET m = 0 - n
+LET i = 1 / z
+LET n = 0 + 1 / 1
+LET a = i
+LET j = +a * m - -2.5 / -n + +m * +0
+PRINT j / z * +j / -z / +z - -m - +n - +0
+PRINT 2.5 - -m
+PRINT -m * -i
+PRINT -n * 2
+"""
+
+
+moduleDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# what the executable built from source with options prints given input
+def runBuilt(tmp_path, source, input="", **options):
+    sourcePath = tmp_path / "program.tiny"
+    sourcePath.write_text(source)
+    executable = str(tmp_path / "program")
+    compileFile(str(sourcePath), executable, Options(exe=executable, **options))
+    return subprocess.run([executable], input=input, capture_output=True, text=True, check=True).stdout
+
+
+# -O gives the same output, except that the sign of a nan can change
+@pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+def test_optimize_keeps_values_not_nan_signs(tmp_path):
+    plain = runBuilt(tmp_path, nanProgram)
+    optimized = runBuilt(tmp_path, nanProgram, optimize=True)
+    assert "nan" in plain
+    assert optimized.replace("-nan", "nan") == plain.replace("-nan", "nan")
+
+
+# fibonacci numbers go past a long well before 100 of them, so with
+# --int-input they stay floats and don't wrap round to negative
+@pytest.mark.skipif(shutil.which("cc") is None, reason="needs a C compiler")
+def test_int_input_keeps_longs_in_range(tmp_path):
+    with open(os.path.join(moduleDirectory, "fib.tiny")) as sourceFile:
+        source = sourceFile.read()
+    plain = runBuilt(tmp_path, source, "100\n")
+    assert runBuilt(tmp_path, source, "100\n", optimize=True, int_input=True) == plain
+    assert "-" not in plain
+
+
+# an expression written out with every operation in brackets
+def expressionText(node):
+    kind = type(node)
+    if kind is Variable:
+        return node.name
+    if kind is Number:
+        return node.text
+    if kind is UnaryOp:
+        return node.op + expressionText(node.operand)
+    return "(" + expressionText(node.left) + " " + node.op + " " + expressionText(node.right) + ")"
+
+# statements written out as Teeny Tiny, a line each
+def listing(statements, indent=""):
+    lines = []
+    for node in statements:
+        kind = type(node)
+        if kind is Let:
+            lines.append(indent + "LET " + node.name + " = " + expressionText(node.expression))
+        elif kind is Print:
+            lines.append(indent + "PRINT " + expressionText(node.expression))
+        elif kind is PrintString:
+            lines.append(indent + 'PRINT "' + node.text + '"')
+        elif kind is Input or kind is Label or kind is Goto:
+            lines.append(indent + kind.__name__.upper() + " " + node.name)
+        elif kind is If:
+            lines.append(indent + "IF " + expressionText(node.comparison) + " THEN")
+            lines += listing(node.body, indent + "    ")
+            lines.append(indent + "ENDIF")
+        else:
+            lines.append(indent + "WHILE " + expressionText(node.comparison) + " REPEAT")
+            lines += listing(node.body, indent + "    ")
+            lines.append(indent + "ENDWHILE")
+    return lines
+
+def runProgram(program, input):
+    output = io.StringIO()
+    ClosureEngine(program, io.StringIO(input), output).run()
+    return output.getvalue()
+
+# the code optimizationPass makes of source, after checking it prints the
+# same as source for each of inputs
+def rewritten(source, optimizationPass, inputs=("",)):
+    program = Parser(Lexer(source)).program()
+    optimizationPass().program(program)
+    for input in inputs:
+        assert runProgram(program, input) == runProgram(Parser(Lexer(source)).program(), input)
+    return "\n".join(listing(program.statements)) + "\n"
+
+
+# a LET that is the same every pass goes before the loop, behind the loop
+# test so a loop that doesn't run still leaves k alone
+def test_loop_hoists_behind_test():
+    source = """INPUT n
+LET i = 0
+LET k = 5
+WHILE i < n REPEAT
+    LET k = n * 2
+    LET i = i + 1
+ENDWHILE
+PRINT k
+"""
+    assert rewritten(source, LoopOptimizer, ["0\n", "3\n"]) == """INPUT n
+LET i = 0
+LET k = 5
+IF (i < n) THEN
+    LET k = (n * 2)
+    WHILE (i < n) REPEAT
+        LET i = (i + 1)
+    ENDWHILE
+ENDIF
+PRINT k
+"""
+
+# a loop that runs a known few times becomes copies of its body
+def test_loop_unrolls():
+    source = """LET i = 0
+WHILE i < 3 REPEAT
+    PRINT i
+    LET i = i + 1
+ENDWHILE
+"""
+    assert rewritten(source, LoopOptimizer) == """LET i = 0
+PRINT i
+LET i = (i + 1)
+PRINT i
+LET i = (i + 1)
+PRINT i
+LET i = (i + 1)
+"""
+
+# i * 4 becomes a variable that goes up by 4 each pass
+def test_loop_reduces_strength():
+    source = """LET i = 0
+WHILE i < 100 REPEAT
+    PRINT i * 4
+    LET i = i + 1
+ENDWHILE
+"""
+    assert rewritten(source, LoopOptimizer) == """LET i = 0
+LET _s1 = (i * 4)
+WHILE (i < 100) REPEAT
+    PRINT _s1
+    LET i = (i + 1)
+    LET _s1 = (_s1 + 4)
+ENDWHILE
+"""
+
+# a counter changed twice a pass is neither unrolled nor reduced
+def test_loop_counter_assigned_twice():
+    source = """LET i = 0
+WHILE i < 6 REPEAT
+    PRINT i * 3
+    LET i = i + 1
+    LET i = i + 1
+ENDWHILE
+"""
+    assert rewritten(source, LoopOptimizer) == """LET i = 0
+WHILE (i < 6) REPEAT
+    PRINT (i * 3)
+    LET i = (i + 1)
+    LET i = (i + 1)
+ENDWHILE
+"""
+
+# x * y is worked out once while x and y stay the same, int math isn't
+# shared since a float variable can't hold it exactly
+def test_shared_subexpressions():
+    source = """INPUT x
+INPUT y
+LET a = x * y + 1
+PRINT x * y + 2
+LET b = x * y
+PRINT x * y - a
+INPUT x
+PRINT x * y
+PRINT 2 * 3 + 2 * 3
+"""
+    assert rewritten(source, SubexpressionEliminator, ["2\n3\n4\n"]) == """INPUT x
+INPUT y
+LET _t1 = (x * y)
+LET a = (_t1 + 1)
+PRINT (_t1 + 2)
+LET b = _t1
+PRINT (_t1 - a)
+INPUT x
+PRINT (x * y)
+PRINT ((2 * 3) + (2 * 3))
+"""
+
+# a LET that stores the whole expression is read back while it holds it,
+# after that from a variable of its own
+def test_shared_from_let():
+    source = """INPUT x
+LET a = x / 3
+PRINT x / 3 + a
+LET a = 1
+PRINT x / 3
+"""
+    assert rewritten(source, SubexpressionEliminator, ["2\n"]) == """INPUT x
+LET _t1 = (x / 3)
+LET a = _t1
+PRINT (a + a)
+LET a = 1
+PRINT _t1
+"""
+
+# a GOTO to a GOTO goes straight to where that one goes, and a loop made of
+# an IF and a GOTO becomes a WHILE behind its LABEL, where a GOTO from
+# outside the loop still goes to its test
+def test_threaded_goto_loop():
+    source = """LET i = 5
+IF i > 1 THEN
+    LET i = 0
+    GOTO start
+ENDIF
+PRINT "skipped"
+LABEL start
+GOTO top
+LABEL top
+IF i < 3 THEN
+    PRINT i
+    LET i = i + 1
+    GOTO top
+ENDIF
+PRINT "done"
+"""
+    assert rewritten(source, JumpThreader) == """LET i = 5
+IF (i > 1) THEN
+    LET i = 0
+    GOTO top
+ENDIF
+PRINT "skipped"
+LABEL start
+LABEL top
+WHILE (i < 3) REPEAT
+    PRINT i
+    LET i = (i + 1)
+ENDWHILE
+PRINT "done"
+"""
+
+# a loop left by a GOTO out tests (test) == 0, not the opposite comparison,
+# since with a nan x >= 3 and x < 3 are both false
+def test_threaded_exit_negation_with_nan():
+    source = """LET z = 0
+LET x = z / z
+LABEL top
+IF x >= 3 THEN
+    GOTO out
+ENDIF
+PRINT "body"
+LET x = 5
+GOTO top
+LABEL out
+PRINT "done"
+"""
+    assert rewritten(source, JumpThreader) == """LET z = 0
+LET x = (z / z)
+LABEL top
+WHILE ((x >= 3) == 0) REPEAT
+    PRINT "body"
+    LET x = 5
+ENDWHILE
+LABEL out
+PRINT "done"
+"""
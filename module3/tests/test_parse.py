@@ -0,0 +1,32 @@
+import pytest
+from tiny.compiler import *
+
+
+# every diagnostic the parser reports for source, with lexer
+def diagnostics(lexer, source):
+    with pytest.raises(SystemExit) as exit:
+        Parser(lexers[lexer](source)).program()
+    return exit.value.code.split("\n")
+
+
+# a lexing error gives one diagnostic for its line, wherever it comes up,
+# also while skipping ahead after a syntax error
+@pytest.mark.parametrize("lexer", sorted(lexers))
+@pytest.mark.parametrize("source, count", [
+    ("PRINT 1.", 1),
+    ("@ 1\n", 1),
+    ("LET a = 1\nPRINT 1.\nPRINT a\n", 1),
+    ("IF 1 > 0 THEN\nPRINT @ 2\nENDIF\n", 1),
+    ("PRINT 1 1\nPRINT 1.\nPRINT 2\n", 2),
+    ("IF 1 THEN\nPRINT @ 2\nENDIF\n", 2),
+])
+def test_one_diagnostic_per_lexing_error(lexer, source, count):
+    assert len(diagnostics(lexer, source)) == count
+
+
+# a bad line after a bad line is skipped without going deeper each time
+@pytest.mark.parametrize("lexer", sorted(lexers))
+def test_many_lexing_errors(lexer):
+    with pytest.raises(SystemExit) as exit:
+        Parser(lexers[lexer]("@\n" * 3000), errorLimit=0).program()
+    assert len(exit.value.code.split("\n")) == 3000
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import threading
+from tiny.cli import main
+from tiny.server import CompileServer
+
+moduleDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# a stand-in C compiler that writes its name to the executable
+def fakeCompiler(directory, name):
+    path = directory / name
+    path.write_text('#!/bin/sh\nwhile [ $# -gt 1 ]; do shift; done\ncat > /dev/null\necho %s > "$1"\n' % name)
+    path.chmod(0o755)
+    return str(path)
+
+
+# --exe through the server builds with the client's $CC, also when the
+# server has one of its own
+def test_client_cc_builds(tmp_path, monkeypatch):
+    monkeypatch.setenv("CC", fakeCompiler(tmp_path, "servercc"))
+    socketPath = str(tmp_path / "server.sock")
+    source = tmp_path / "program.tiny"
+    source.write_text('PRINT "hi"\n')
+
+    with CompileServer(socketPath, main) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            environment = dict(os.environ, TEENYTINY_SOCKET=socketPath,
+                TEENYTINY_CACHE=str(tmp_path / "cache"))
+            for name in ("servercc", "clientcc", "servercc"):
+                environment["CC"] = fakeCompiler(tmp_path, name)
+                subprocess.run([sys.executable, os.path.join(moduleDirectory, "client.py"),
+                    str(source), "-q", "--exe", str(tmp_path / "program"), "--cache", str(tmp_path / "cache")],
+                    env=environment, check=True)
+                assert (tmp_path / "program").read_text() == name + "\n"
+        finally:
+            server.shutdown()
+            thread.join()
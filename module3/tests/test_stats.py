@@ -0,0 +1,20 @@
+import json
+import pytest
+from tiny.compiler import *
+from tiny.generate import ProgramGenerator
+
+
+# the phases cover the whole compile, setting up the lexer included, for
+# every lexer
+@pytest.mark.parametrize("lexer", sorted(lexers))
+def test_phases_add_up_to_total(tmp_path, lexer):
+    source = tmp_path / "program.tiny"
+    source.write_text(ProgramGenerator(1, 2000).program())
+    statsPath = tmp_path / "stats.json"
+    compileFile(str(source), str(tmp_path / "program.c"),
+        Options(lexer=lexer, stats_json=str(statsPath)))
+
+    stats = json.loads(statsPath.read_text())
+    phases = sum(phase["seconds"] for phase in stats["phases"])
+    assert phases >= 0.9 * stats["seconds"]
+    assert phases <= stats["seconds"]
@@ -0,0 +1,3 @@
+# Teeny Tiny compiler.
+# the modules are loaded as they are needed rather than from here, so
+# importing the package costs nothing until something is used
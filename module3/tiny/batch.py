@@ -0,0 +1,63 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from .compiler import *
+
+# Compiles many files at once across a pool of worker processes.
+# a file that fails to compile is reported and the rest carry on
+
+
+# source files for paths, with the directories searched for .tiny files.
+# returns (source, output) pairs, outputs go next to the source or under
+# outputDir keeping the path below the directory it was found in
+def batchJobs(paths, outputDir, suffix):
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if name.endswith(".tiny"):
+                        source = os.path.join(directory, name)
+                        jobs.append((source, outputPath(source, os.path.relpath(source, path), outputDir, suffix)))
+        else:
+            jobs.append((path, outputPath(path, os.path.basename(path), outputDir, suffix)))
+    return jobs
+
+def outputPath(source, relative, outputDir, suffix):
+    if outputDir is None:
+        return os.path.splitext(source)[0] + suffix
+    return os.path.join(outputDir, os.path.splitext(relative)[0] + suffix)
+
+
+# compile every job, returns a list of (source, error) with error None
+# for the files that worked
+def compileBatch(jobs, args, workers=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = [(source, output, args) for source, output in jobs]
+    if workers == 1 or len(tasks) < 2:
+        return [compileJob(task) for task in tasks]
+
+    # hand out work in chunks so thousands of small files don't each cost
+    # a round trip to a worker
+    chunk = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(compileJob, tasks, chunksize=chunk))
+
+# compile one file in a worker, the compiler exits on an error so that is
+# caught and sent back as the message. anything else that goes wrong is
+# that file's failure too, it doesn't stop the batch
+def compileJob(task):
+    source, output, args = task
+    try:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        compileFile(source, output, args)
+    except SystemExit as error:
+        return source, str(error.code)
+    except (OSError, ValueError) as error:
+        return source, str(error)
+    except Exception as error:
+        return source, "%s: %s" % (type(error).__name__, error)
+    return source, None
@@ -0,0 +1,132 @@
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+
+# cache size used when none is given, in bytes
+DEFAULT_SIZE = 256 * 1024 * 1024
+
+# stores between full scans of the cache, which fix the running total
+RESCAN_STORES = 1000
+
+# bytes of a source hashed at a time
+HASH_CHUNK = 1 << 16
+
+
+# Content addressed cache of compiler output.
+# an entry is named by a hash of the source, the compiler itself and the
+# options, plus a suffix for the kind of output (".c", ".ttb", ...), so a
+# changed source, compiler or option just misses. using an entry touches
+# it, and storing one drops the least recently used entries until the
+# cache is back under maxSize bytes. entries are written to a temp file and
+# renamed into place so several compilers can share one cache.
+# the size of the cache is kept as a running total in .usage, a line per
+# store with how much it added, so a store only scans the whole cache when
+# the total goes over maxSize or every RESCAN_STORES stores
+class CompileCache:
+    def __init__(self, directory, maxSize=DEFAULT_SIZE):
+        self.directory = directory
+        self.maxSize = maxSize
+        os.makedirs(directory, exist_ok=True)
+
+    # name for the output of compiling sourceFile (a binary file) with
+    # options (str). the file is read a chunk at a time, so a big source
+    # isn't all in memory just to be hashed
+    def key(self, sourceFile, options):
+        digest = hashlib.sha256()
+        digest.update(compilerVersion().encode())
+        digest.update(b'\0' + options.encode() + b'\0')
+        while True:
+            chunk = sourceFile.read(HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, name):
+        return os.path.join(self.directory, name[:2], name)
+
+    # copy entry name to destination, false if it isn't cached
+    def fetch(self, name, destination):
+        path = self.path(name)
+        try:
+            shutil.copyfile(path, destination)
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    # add the file at source as entry name
+    def store(self, name, source):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # dot files are left out of eviction while they are being written
+        handle, temporary = tempfile.mkstemp(prefix='.', dir=os.path.dirname(path))
+        os.close(handle)
+        try:
+            shutil.copyfile(source, temporary)
+            added = os.path.getsize(temporary)
+            try:
+                added -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.record(added)
+
+    # add size to the running total, evicting when it's over maxSize. a
+    # cache without a total yet, or whose total is due a check, is scanned
+    def record(self, size):
+        usage = os.path.join(self.directory, '.usage')
+        counted = os.path.exists(usage)
+        # one short append, so lines from compilers storing at once don't mix
+        with open(usage, 'a') as usageFile:
+            usageFile.write('%d\n' % size)
+        with open(usage) as usageFile:
+            sizes = usageFile.read().split()
+        if not counted or len(sizes) > RESCAN_STORES or sum(map(int, sizes)) > self.maxSize:
+            self.evict()
+
+    # drop least recently used entries until the cache fits in maxSize
+    def evict(self):
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.directory, '??', '*')):
+            try:
+                status = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+            total += status.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        # start the running total again from what's really there
+        handle, temporary = tempfile.mkstemp(prefix='.', dir=self.directory)
+        with os.fdopen(handle, 'w') as usageFile:
+            usageFile.write('%d\n' % total)
+        os.replace(temporary, os.path.join(self.directory, '.usage'))
+
+
+# hash of the compiler's own source, so any change to it misses the cache
+compilerHash = None
+
+def compilerVersion():
+    global compilerHash
+    if compilerHash is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+            with open(path, 'rb') as sourceFile:
+                digest.update(os.path.basename(path).encode() + b'\0' + sourceFile.read())
+        compilerHash = digest.hexdigest()
+    return compilerHash
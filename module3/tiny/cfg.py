@@ -0,0 +1,83 @@
+from .nodes import *
+
+# Control flow graph of a program, for passes that need to follow GOTOs.
+# the code is cut into basic blocks at every LABEL, GOTO, IF and WHILE.
+# a block runs its statements (only LET, INPUT and PRINT), then goes to
+# target if it has no test or the test passes, else to otherwise. a target
+# of None is the end of the program. block 0 is where the program starts.
+# with nested, an IF or WHILE with no LABEL or GOTO in it is left whole as
+# a statement of its block, for code that can run it as it is
+class Block:
+    __slots__ = ('statements', 'test', 'target', 'otherwise')
+
+    def __init__(self):
+        self.statements = []
+        self.test = None
+        self.target = None
+        self.otherwise = None
+
+    # blocks that can run next
+    def successors(self):
+        if self.test is None:
+            return [self.target]
+        return [self.target, self.otherwise]
+
+
+# list of the blocks for statements, with targets as indexes into it
+def controlFlow(statements, nested=False):
+    builder = ControlFlowBuilder(nested)
+    builder.lower(statements)
+    return builder.finish()
+
+
+class ControlFlowBuilder:
+    def __init__(self, nested=False):
+        self.nested = nested
+        self.blocks = []
+        self.labels = {}
+        self.current = self.newBlock()
+
+    def newBlock(self):
+        self.blocks.append(Block())
+        return len(self.blocks) - 1
+
+    # end the current block with a jump to block
+    def jump(self, block):
+        self.blocks[self.current].target = block
+
+    # add statements to the blocks, leaving self.current at the end of them
+    def lower(self, statements):
+        for node in statements:
+            kind = type(node)
+            if kind is Label:
+                block = self.newBlock()
+                self.jump(block)
+                self.current = block
+                self.labels[node.name] = block
+            elif kind is Goto:
+                # resolved to a block once every label is known
+                self.jump(node.name)
+                self.current = self.newBlock()
+            elif (kind is If or kind is While) and (jumps(node.body) or not self.nested):
+                if kind is If:
+                    test = self.current
+                else:
+                    test = self.newBlock()
+                    self.jump(test)
+                body = self.newBlock()
+                self.current = body
+                self.lower(node.body)
+                after = self.newBlock()
+                self.jump(test if kind is While else after)
+                block = self.blocks[test]
+                block.test, block.target, block.otherwise = node.comparison, body, after
+                self.current = after
+            else:
+                self.blocks[self.current].statements.append(node)
+
+    # resolve GOTOs now every label is known
+    def finish(self):
+        for block in self.blocks:
+            if type(block.target) is str:
+                block.target = self.labels[block.target]
+        return self.blocks
@@ -0,0 +1,173 @@
+from .nodes import *
+from .values import *
+from .cinput import *
+
+# Walks the syntax tree from the parser and emits the matching C code.
+# with inferTypes variables that only hold small whole numbers are longs,
+# and with intInput as well INPUT reads whole numbers into longs. with
+# peephole casts that change nothing are left out. programs with INPUT get
+# the runtime in cinput.py to read their numbers
+class CGenerator:
+    def __init__(self, emitter, inferTypes=False, intInput=False, peephole=False):
+        self.emitter = emitter
+        self.inferTypes = inferTypes or intInput
+        self.intInput = intInput
+        self.peephole = peephole
+        self.types = None
+        self.ctypes = {}
+        self.statements = {
+            PrintString: self.printString,
+            Print: self.print,
+            If: self.ifStatement,
+            While: self.whileStatement,
+            Label: self.label,
+            Goto: self.goto,
+            Let: self.let,
+            Input: self.input,
+        }
+
+    # program ::= {statement}
+    def program(self, program):
+        if self.inferTypes:
+            # only loaded when asked for, to keep startup quick
+            from .infer import TypeInference
+            self.types = TypeInference(self.intInput).program(program)
+
+        # header
+        self.emitter.headerLine("#include <stdio.h>")
+        inputs = {node.name for node in walk(program.statements) if type(node) is Input}
+        if inputs:
+            longs = inputs & self.types.longs if self.types else set()
+            self.emitter.headerLine(inputRuntime)
+            if inputs - longs:
+                self.emitter.headerLine(floatRuntime)
+            if longs:
+                self.emitter.headerLine(longRuntime)
+        self.emitter.headerLine("int main(void) {")
+        for name in program.symbols:
+            declaration = "long " if self.types and name in self.types.longs else "float "
+            self.emitter.headerLine(declaration + name + ";")
+
+        self.block(program.statements)
+
+        # end of c code
+        self.emitter.emitLine("return 0;")
+        self.emitter.emitLine("}")
+
+    def block(self, statements):
+        for statement in statements:
+            self.statements[type(statement)](statement)
+
+    def printString(self, node):
+        self.emitter.emitLine("printf(\"" + node.text + "\\n\");")
+
+    def print(self, node):
+        if self.peephole and self.ctype(node.expression) == FLOAT and not self.integer(node.expression):
+            # already a C float
+            self.emitter.emitLine("printf(\"%" + ".2f\\n\", " + self.expression(node.expression) + ");")
+        else:
+            self.emitter.emitLine("printf(\"%" + ".2f\\n\", (float)(" + self.expression(node.expression) + "));")
+
+    def ifStatement(self, node):
+        self.emitter.emitLine("if(" + self.expression(node.comparison) + ") {")
+        self.block(node.body)
+        self.emitter.emitLine("}")
+
+    def whileStatement(self, node):
+        self.emitter.emitLine("while(" + self.expression(node.comparison) + ") {")
+        self.block(node.body)
+        self.emitter.emitLine("}")
+
+    def label(self, node):
+        self.emitter.emitLine(node.name + ":")
+
+    def goto(self, node):
+        self.emitter.emitLine("goto " + node.name + ";")
+
+    def let(self, node):
+        self.emitter.emitLine(node.name + " = " + self.expression(node.expression) + ";")
+
+    def input(self, node):
+        if self.types and node.name in self.types.longs:
+            self.emitter.emitLine("readLong(&" + node.name + ");")
+        else:
+            self.emitter.emitLine("readFloat(&" + node.name + ");")
+
+    # return the C text for an expression or comparison, only adding
+    # parentheses where C would otherwise group it differently
+    def expression(self, node):
+        kind = type(node)
+        if kind is Variable:
+            return node.name
+        if kind is Number:
+            # keep -1 from gluing onto a minus in front of it
+            return "(" + node.text + ")" if node.text[0] == '-' else node.text
+        if kind is UnaryOp:
+            operand = self.expression(node.operand)
+            if type(node.operand) is not Variable and type(node.operand) is not Number:
+                operand = "(" + operand + ")"
+            if self.floatMath(node):
+                # a long has no -0
+                operand = "(float)" + operand
+            return node.op + operand
+
+        # binary op or comparison, a step at a time up the chain
+        bottom, operations = chain(node)
+        text = self.expression(bottom)
+        for operation in operations:
+            text = self.operation(operation, text)
+        return text
+
+    # the C text for left op right, given the text for left
+    def operation(self, node, left):
+        level = precedence[node.op]
+        right = self.expression(node.right)
+        castLeft = castRight = False
+        if self.floatMath(node):
+            # long operands that must still be worked out as floats
+            castLeft = self.ctype(node.left) == FLOAT
+            castRight = not castLeft
+        if type(node.left) in (BinaryOp, Comparison) and (castLeft or precedence[node.left.op] < level):
+            left = "(" + left + ")"
+        if castLeft:
+            left = "(float)" + left
+        if type(node.right) in (BinaryOp, Comparison) and (castRight or precedence[node.right.op] <= level):
+            right = "(" + right + ")"
+        if castRight:
+            right = "(float)" + right
+        elif right[0] == node.op:
+            # a - -b would read as a-- b
+            right = " " + right
+        return left + node.op + right
+
+    # true if node is float math whose operands are all C integers now,
+    # so one needs a cast to keep C from doing integer math
+    def floatMath(self, node):
+        if self.types is None or self.ctype(node) != FLOAT or self.types.integral(node):
+            return False
+        if type(node) is UnaryOp:
+            return self.integer(node.operand)
+        return type(node) is BinaryOp and self.integer(node.left) and self.integer(node.right)
+
+    # true if the C type of node is int or long
+    def integer(self, node):
+        ctype = self.ctype(node)
+        return ctype == INT or (ctype == FLOAT and self.types.integral(node))
+
+    # typeOf node, kept for each node of a chain since it is asked for at
+    # every step up it and working it out walks the chain below
+    def ctype(self, node):
+        operations = []
+        while (type(node) is BinaryOp or type(node) is Comparison) and id(node) not in self.ctypes:
+            operations.append(node)
+            node = node.left
+        ctype = self.ctypes.get(id(node))
+        if ctype is None:
+            ctype = typeOf(node)
+        for operation in reversed(operations):
+            if type(operation) is Comparison:
+                ctype = INT
+            else:
+                ctype = max(ctype, self.ctype(operation.right))
+            self.ctypes[id(operation)] = ctype
+        return ctype
@@ -0,0 +1,233 @@
+# C runtime for INPUT, put in front of the generated code of programs
+# that read numbers. stdin is read a block at a time and numbers are parsed
+# by hand, reading exactly what scanf("%f") or scanf("%ld") would: at the
+# end of input the variable is left alone, and input that isn't a number
+# sets it to 0 and skips a word, with the chars read before finding that out
+# gone like in glibc. a plain number of up to 7 digits is worked out with
+# one float division, which is exact since both sides are, anything else
+# goes through strtof. inputRuntime is what both kinds of INPUT need
+inputRuntime = r"""#include <stdlib.h>
+#include <unistd.h>
+static char inputBuffer[65536];
+static int inputLength, inputPos, inputEnded;
+
+/* the next char without using it, EOF at the end of input */
+static int peekChar(void) {
+    if (inputPos == inputLength) {
+        if (inputEnded)
+            return EOF;
+        /* like scanf, show what was printed before waiting for input */
+        fflush(stdout);
+        inputLength = read(0, inputBuffer, sizeof inputBuffer);
+        inputPos = 0;
+        if (inputLength <= 0) {
+            inputLength = 0;
+            inputEnded = 1;
+            return EOF;
+        }
+    }
+    return (unsigned char)inputBuffer[inputPos];
+}
+
+static int isSpace(int c) {
+    return c == ' ' || (c >= '\t' && c <= '\r');
+}
+
+static int isDigit(int c, int hex) {
+    return (c >= '0' && c <= '9') || (hex && ((c >= 'a' && c <= 'f') || (c >= 'A' && c <= 'F')));
+}
+
+/* skip whitespace, returning the char after it */
+static int skipSpace(void) {
+    int c;
+    while (isSpace(c = peekChar()))
+        inputPos++;
+    return c;
+}
+
+/* scanf("%*s") */
+static void skipWord(void) {
+    int c = skipSpace();
+    while (c != EOF && !isSpace(c)) {
+        inputPos++;
+        c = peekChar();
+    }
+}
+"""
+
+# scanf("%f"), for programs that read into floats
+floatRuntime = r"""static char *numberText;
+static int numberLength, numberSize;
+static const float powersOfTen[] = {1e0f, 1e1f, 1e2f, 1e3f, 1e4f, 1e5f, 1e6f, 1e7f};
+
+static int lower(int c) {
+    return c >= 'A' && c <= 'Z' ? c + 'a' - 'A' : c;
+}
+
+static void addChar(int c) {
+    if (numberLength + 1 >= numberSize) {
+        numberSize = numberSize ? numberSize * 2 : 64;
+        numberText = realloc(numberText, numberSize);
+        if (!numberText)
+            abort();
+    }
+    numberText[numberLength++] = c;
+    numberText[numberLength] = 0;
+}
+
+/* read word in any case, true if all of it is there. like glibc the
+   char that doesn't match is read too */
+static int expect(const char *word) {
+    int c;
+    for (; *word; word++) {
+        if ((c = peekChar()) == EOF)
+            return 0;
+        inputPos++;
+        if (lower(c) != *word)
+            return 0;
+    }
+    return 1;
+}
+
+static int addDigits(int hex) {
+    int count = 0, c;
+    while (isDigit(c = peekChar(), hex)) {
+        addChar(c);
+        inputPos++;
+        count++;
+    }
+    return count;
+}
+
+/* an exponent with no digits is read but left off, like glibc does */
+static void addExponent(int letter) {
+    int sign = 0;
+    if (lower(peekChar()) != letter)
+        return;
+    inputPos++;
+    if (peekChar() == '+' || peekChar() == '-')
+        sign = inputBuffer[inputPos++];
+    if (isDigit(peekChar(), 0)) {
+        addChar(letter);
+        if (sign)
+            addChar(sign);
+        addDigits(0);
+    }
+}
+
+/* scanf("%f"), 1 with the number in value, 0 if the input isn't a
+   number, EOF at the end of input */
+static int scanFloat(float *value) {
+    int c = skipSpace(), negative = 0, start, digits, fraction = 0;
+    if (c == EOF)
+        return EOF;
+    numberLength = 0;
+    if (c == '+' || c == '-') {
+        negative = c == '-';
+        inputPos++;
+        c = peekChar();
+    }
+    if (negative)
+        addChar('-');
+
+    if (lower(c) == 'i') {
+        if (!expect("inf") || (lower(peekChar()) == 'i' && !expect("inity")))
+            return 0;
+        *value = strtof(negative ? "-inf" : "inf", 0);
+        return 1;
+    }
+    if (lower(c) == 'n') {
+        if (!expect("nan"))
+            return 0;
+        *value = strtof(negative ? "-nan" : "nan", 0);
+        return 1;
+    }
+    start = numberLength;
+    digits = 0;
+    if (c == '0') {
+        addChar(c);
+        inputPos++;
+        digits = 1;
+        if (lower(peekChar()) == 'x') {
+            inputPos++;
+            c = peekChar();
+            if (!isDigit(c, 1) && c != '.')
+                return 0;
+            addChar('x');
+            digits = addDigits(1);
+            if (peekChar() == '.') {
+                inputPos++;
+                addChar('.');
+                digits += addDigits(1);
+            }
+            /* "0x." is 0, and glibc doesn't look for an exponent then */
+            if (digits)
+                addExponent('p');
+            else
+                addChar('0');
+            *value = strtof(numberText, 0);
+            return 1;
+        }
+    }
+    digits += addDigits(0);
+    if (peekChar() == '.') {
+        inputPos++;
+        addChar('.');
+        fraction = addDigits(0);
+        digits += fraction;
+    }
+    if (!digits)
+        return 0;
+    if (digits <= 7 && lower(peekChar()) != 'e') {
+        /* a whole number exact in a float over a power of ten */
+        long mantissa = 0;
+        for (; start < numberLength; start++)
+            if (numberText[start] != '.')
+                mantissa = mantissa * 10 + numberText[start] - '0';
+        *value = (float)mantissa / powersOfTen[fraction];
+        if (negative)
+            *value = -*value;
+        return 1;
+    }
+    addExponent('e');
+    *value = strtof(numberText, 0);
+    return 1;
+}
+
+static void readFloat(float *variable) {
+    if (scanFloat(variable) == 0) {
+        *variable = 0;
+        skipWord();
+    }
+}
+"""
+
+# scanf("%ld"), for programs that read into longs
+longRuntime = r"""#include <limits.h>
+static void readLong(long *variable) {
+    int c = skipSpace(), negative = 0, digits = 0;
+    unsigned long value = 0, limit;
+    if (c == EOF)
+        return;
+    if (c == '+' || c == '-') {
+        negative = c == '-';
+        inputPos++;
+    }
+    /* too big saturates, like strtol */
+    limit = negative ? 0 - (unsigned long)LONG_MIN : LONG_MAX;
+    while (isDigit(c = peekChar(), 0)) {
+        inputPos++;
+        digits++;
+        if (value > (limit - (c - '0')) / 10)
+            value = limit;
+        else
+            value = value * 10 + c - '0';
+    }
+    if (!digits) {
+        *variable = 0;
+        skipWord();
+        return;
+    }
+    *variable = negative ? (long)(0 - value) : (long)value;
+}
+"""
@@ -0,0 +1,169 @@
+import os
+import sys
+from .compiler import *
+
+# Command line. each subcommand imports what it needs when it runs, and a
+# plain "teenytiny file.tiny" skips argparse too, so a one-shot compile
+# only loads the lexer, parser and C generator
+
+def main():
+    argv = sys.argv[1:]
+    # "run" executes the program here instead of writing C
+    if argv[:1] == ['run']:
+        run(argv[1:])
+        return
+    if argv[:1] == ['batch']:
+        batch(argv[1:])
+        return
+    if argv[:1] == ['serve']:
+        serve(argv[1:])
+        return
+
+    quiet = '-q' in argv or '--quiet' in argv
+    if not quiet:
+        print("Teeny Tiny Compiler")
+
+    # the usual case, one file and no options
+    if len(argv) == 1 and not argv[0].startswith('-'):
+        compileFile(argv[0], "out.c", Options(cache=os.environ.get("TEENYTINY_CACHE")))
+        print("compiling done")
+        return
+
+    argParser = argumentParser("teenytiny")
+    compileOptions(argParser)
+    argParser.add_argument("--bytecode", metavar="FILE",
+        help="write bytecode for 'teenytiny run' to FILE instead of C")
+    argParser.add_argument("--exe", metavar="FILE",
+        help="build the executable FILE with the C compiler ($CC or cc) instead of writing C")
+    argParser.add_argument("--native", action="store_true",
+        help="with --exe, tune the executable for this machine (-march=native)")
+    argParser.add_argument("--time-passes", "--stats", action="store_true",
+        help="print the time, peak memory and counts for each phase to stderr")
+    argParser.add_argument("--stats-json", metavar="FILE",
+        help="write the same figures to FILE as json")
+    args = argParser.parse_args(argv)
+
+    output = args.bytecode or args.exe or "out.c"
+    compileFile(args.source, output, args)
+    if not quiet:
+        print("compiling done")
+
+# teenytiny batch [options] paths..., compiles each file on its own
+def batch(argv):
+    from .batch import batchJobs, compileBatch
+
+    argParser = argumentParser("teenytiny batch")
+    compileOptions(argParser)
+    argParser.add_argument("paths", nargs="*", metavar="path",
+        help="more source files, or directories to compile every .tiny file in")
+    argParser.add_argument("--bytecode", action="store_true",
+        help="write bytecode (.ttb) instead of C (.c)")
+    argParser.add_argument("-o", "--output-dir", metavar="DIR",
+        help="write outputs under DIR instead of next to each source")
+    argParser.add_argument("-j", "--jobs", type=int, default=None,
+        help="worker processes (default: one per CPU)")
+    # --time-passes and --exe are for one compile at a time
+    argParser.set_defaults(time_passes=False, stats_json=None, exe=None, native=False)
+    args = argParser.parse_args(argv)
+
+    paths = ([args.source] if args.source is not None else []) + args.paths
+    if not paths:
+        sys.exit("Error: Compiler needs source file as argument.")
+    jobs = batchJobs(paths, args.output_dir, ".ttb" if args.bytecode else ".c")
+    results = compileBatch(jobs, args, args.jobs)
+
+    failed = [(source, error) for source, error in results if error is not None]
+    for source, error in failed:
+        print(source + ": " + error, file=sys.stderr)
+    if not args.quiet or failed:
+        print("compiled " + str(len(results) - len(failed)) + " of " + str(len(results))
+            + " files, " + str(len(failed)) + " failed")
+    if failed:
+        sys.exit(1)
+
+# teenytiny serve, answers compiles from client.py until killed
+def serve(argv):
+    import argparse
+    import signal
+    from .cache import compilerVersion
+    from .server import CompileServer, defaultSocket
+
+    argParser = argparse.ArgumentParser(prog="teenytiny serve")
+    argParser.add_argument("--socket", default=defaultSocket(),
+        help="Unix socket to listen on (default: $TEENYTINY_SOCKET or %(default)s)")
+    args = argParser.parse_args(argv)
+
+    # load everything a request might need once, here, rather than in
+    # every forked request
+    from . import closure, infer, optimize, pygen, vm
+    from .batch import compileBatch
+    compilerVersion()
+    signal.signal(signal.SIGTERM, stopServer)
+    with CompileServer(args.socket, main) as server:
+        print("Teeny Tiny compile server listening on " + args.socket)
+        sys.stdout.flush()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+# SIGTERM stops the server the way ^C does, removing its socket
+def stopServer(signalNumber, frame):
+    raise KeyboardInterrupt
+
+# teenytiny run [options] source
+def run(argv):
+    from .vm import MAGIC, Bytecode, BytecodeCompiler, VirtualMachine
+
+    # engines that can run a program
+    engines = ['closure', 'vm', 'python']
+
+    argParser = argumentParser("teenytiny run")
+    argParser.add_argument("--engine", choices=engines, default="closure",
+        help="how to run the program (default: closure)")
+    args = argParser.parse_args(argv)
+
+    # bytecode from --bytecode runs as is, without lexing or parsing
+    if args.source is not None:
+        with open(args.source, 'rb') as inputFile:
+            if inputFile.read(len(MAGIC)) == MAGIC:
+                inputFile.seek(0)
+                VirtualMachine(Bytecode.load(inputFile)).run()
+                return
+
+    program = parseSource(args.source, args)
+    if args.engine == 'closure':
+        from .closure import ClosureEngine
+        engine = ClosureEngine(program)
+    elif args.engine == 'python':
+        from .pygen import PythonEngine
+        engine = PythonEngine(program)
+    else:
+        engine = VirtualMachine(BytecodeCompiler().compile(program))
+    engine.run()
+
+# options both compiling and running take
+def argumentParser(prog):
+    import argparse
+    argParser = argparse.ArgumentParser(prog=prog)
+    argParser.add_argument("source", nargs="?")
+    argParser.add_argument("--lexer", choices=lexers, default="char",
+        help="lexer engine (default: char)")
+    argParser.add_argument("-O", "--optimize", action="store_true",
+        help="run the optimization passes first")
+    argParser.add_argument("--error-limit", metavar="N", type=int, default=Options.error_limit,
+        help="stop after N errors, 0 for no limit (default: %(default)s)")
+    return argParser
+
+# options for writing output, compiling one file or a batch
+def compileOptions(argParser):
+    argParser.add_argument("-q", "--quiet", action="store_true",
+        help="don't print progress, only errors")
+    argParser.add_argument("--stream", action="store_true",
+        help="keep generated code in a temp file instead of memory")
+    argParser.add_argument("--int-input", action="store_true",
+        help="INPUT reads whole numbers, so more variables can be longs")
+    argParser.add_argument("--cache", metavar="DIR", default=os.environ.get("TEENYTINY_CACHE"),
+        help="reuse output for unchanged sources from DIR (default: $TEENYTINY_CACHE)")
+    argParser.add_argument("--cache-size", metavar="MB", type=int, default=Options.cache_size,
+        help="size the cache is kept under (default: %(default)s)")
@@ -0,0 +1,212 @@
+import sys
+from array import array
+from .nodes import *
+from .runtime import *
+from .values import *
+from .cfg import *
+
+# closures for each operator, given the closures for its operands
+binaryOps = {
+    '+': lambda left, right: lambda: left() + right(),
+    '-': lambda left, right: lambda: left() - right(),
+    '*': lambda left, right: lambda: left() * right(),
+    '==': lambda left, right: lambda: left() == right(),
+    '!=': lambda left, right: lambda: left() != right(),
+    '<': lambda left, right: lambda: left() < right(),
+    '<=': lambda left, right: lambda: left() <= right(),
+    '>': lambda left, right: lambda: left() > right(),
+    '>=': lambda left, right: lambda: left() >= right(),
+}
+
+# the same with a constant on the right, the usual i + 1 or n > 0
+constantOps = {
+    '+': lambda left, right: lambda: left() + right,
+    '-': lambda left, right: lambda: left() - right,
+    '*': lambda left, right: lambda: left() * right,
+    '==': lambda left, right: lambda: left() == right,
+    '!=': lambda left, right: lambda: left() != right,
+    '<': lambda left, right: lambda: left() < right,
+    '<=': lambda left, right: lambda: left() <= right,
+    '>': lambda left, right: lambda: left() > right,
+    '>=': lambda left, right: lambda: left() >= right,
+}
+
+# most operations of a chain run as one nest of closures, a longer chain is
+# cut into pieces run one after the other so it can't overflow the stack
+PIECE = 64
+
+
+# Runs a program in-process by turning the syntax tree into closures.
+# variables live in a float array indexed by slot so stores round like C
+# floats do. each block of the control flow graph becomes a tuple of
+# (statements, test, target, otherwise): run the statements, then go to
+# target if there's no test or it passes, else to otherwise, with -1 for
+# the end of the program
+class ClosureEngine:
+    def __init__(self, program, input=sys.stdin, output=sys.stdout):
+        self.reader = InputReader(input)
+        self.write = output.write
+        self.slots = {name: slot for slot, name in enumerate(program.symbols)}
+        self.values = array('f', bytes(4 * len(self.slots)))
+
+        self.blocks = [self.block(block) for block in controlFlow(program.statements)]
+        self.finish()
+
+    def run(self):
+        blocks = self.blocks
+        pc = 0
+        while pc >= 0:
+            statements, test, target, otherwise = blocks[pc]
+            for statement in statements:
+                statement()
+            pc = target if test is None or test() else otherwise
+
+    # closures for a block of the control flow graph
+    def block(self, block):
+        statements = [self.statement(node) for node in block.statements]
+        test = None if block.test is None else self.expression(block.test)
+        target = -1 if block.target is None else block.target
+        return [statements, test, target, block.otherwise]
+
+    # skip over empty blocks that only jump somewhere
+    def finish(self):
+        def follow(target):
+            seen = set()
+            while target >= 0 and target not in seen:
+                seen.add(target)
+                statements, test, next, _ = self.blocks[target]
+                if statements or test is not None:
+                    break
+                target = next
+            return target
+
+        for block in self.blocks:
+            block[2] = follow(block[2])
+            if block[3] is not None:
+                block[3] = follow(block[3])
+        start = follow(0)
+        self.blocks = [tuple(block) for block in self.blocks]
+        if start != 0:
+            self.blocks[0] = ((), None, start, None)
+
+    # closure that runs a LET, INPUT or PRINT
+    def statement(self, node):
+        kind = type(node)
+        values = self.values
+        write = self.write
+        if kind is Let:
+            slot = self.slots[node.name]
+            expression = self.expression(node.expression, False)
+            def let():
+                values[slot] = expression()
+            return let
+        if kind is Input:
+            slot = self.slots[node.name]
+            read = self.reader.input
+            def input():
+                values[slot] = read(values[slot])
+            return input
+        if kind is PrintString:
+            text = node.text + '\n'
+            return lambda: write(text)
+        expression = self.expression(node.expression, False)
+        return lambda: write(formatNumber(expression()))
+
+    # closure that works out an expression or comparison. float math is
+    # done in double and rounded back to float, which gives the same result
+    # C gets for one operation. rounded=False leaves off the last rounding
+    # when the caller stores or prints the value, which rounds it anyway
+    def expression(self, node, rounded=True):
+        kind = type(node)
+        if kind is Variable:
+            values = self.values
+            slot = self.slots[node.name]
+            return lambda: values[slot]
+        if kind is Number:
+            value = self.constant(node)
+            return lambda: value
+        if kind is UnaryOp:
+            operand = self.expression(node.operand, rounded)
+            if node.op == '-':
+                return lambda: -operand()
+            return operand
+
+        # a step at a time up the chain
+        bottom, operations = chain(node)
+        closure = self.expression(bottom)
+        leftType = typeOf(bottom)
+        pieces = []
+        for index, operation in enumerate(operations):
+            if index and index % PIECE == 0:
+                # the next piece starts from what this one worked out
+                cell = [None]
+                pieces.append((closure, cell))
+                closure = lambda cell=cell: cell[0]
+            last = index == len(operations) - 1
+            closure, leftType = self.operation(operation, closure, leftType, rounded or not last)
+        if not pieces:
+            return closure
+
+        pieces.append((closure, None))
+        def chained():
+            for piece, cell in pieces:
+                value = piece()
+                if cell is not None:
+                    cell[0] = value
+            return value
+        return chained
+
+    # closure for node given the closure for its left side, which is of
+    # leftType, and the type of what it works out
+    def operation(self, node, left, leftType, rounded):
+        kind = type(node)
+        # C converts both sides to the wider type first
+        resultType = max(leftType, typeOf(node.right))
+        if leftType == INT and resultType == FLOAT:
+            if type(node.left) is Number:
+                value = self.converted(node.left, resultType)
+                left = lambda: value
+            else:
+                intLeft = left
+                left = lambda: toFloat(intLeft())
+        if node.op == '/':
+            right = self.operand(node.right, resultType)
+            if resultType == INT:
+                return (lambda: intDivide(left(), right())), resultType
+            if type(node.right) is Number and self.constant(node.right) != 0:
+                value = self.constant(node.right)
+                closure = lambda: left() / value
+            else:
+                closure = lambda: divide(left(), right())
+        elif type(node.right) is Number:
+            closure = constantOps[node.op](left, self.converted(node.right, resultType))
+        else:
+            closure = binaryOps[node.op](left, self.operand(node.right, resultType))
+
+        if kind is Comparison:
+            return closure, INT
+        if resultType == FLOAT and rounded:
+            return (lambda: toFloat(closure())), resultType
+        return closure, resultType
+
+    # closure for an operand of an operation done in type
+    def operand(self, node, type):
+        if typeOf(node) == INT and type == FLOAT:
+            if isinstance(node, Number):
+                value = self.converted(node, type)
+                return lambda: value
+            closure = self.expression(node)
+            return lambda: toFloat(closure())
+        return self.expression(node)
+
+    # constant as the type it's converted to
+    def converted(self, node, type):
+        value = self.constant(node)
+        if typeOf(node) == INT and type == FLOAT:
+            return toFloat(value)
+        return value
+
+    # python value of a number literal, ints too big for C's int stay ints
+    def constant(self, node):
+        value = literal(node.text)
+        return int(node.text) if value is None else value[0]
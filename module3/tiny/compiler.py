@@ -0,0 +1,158 @@
+from .lex import *
+from .parse import *
+from .emit import *
+from .cgen import *
+import os
+import sys
+
+# lexer engines that can be picked with --lexer
+lexers = {
+    'char': Lexer,
+    'regex': RegexLexer,
+    'compact': CompactLexer,
+}
+
+# the options compileFile takes when there's no command line to parse,
+# the same defaults the command line has
+class Options:
+    lexer = 'char'
+    error_limit = 20
+    optimize = False
+    stream = False
+    int_input = False
+    bytecode = None
+    exe = None
+    native = False
+    cache = None
+    cache_size = 256
+    time_passes = False
+    stats_json = None
+
+    def __init__(self, **options):
+        self.__dict__.update(options)
+
+# compile the file at source into output, C, or with args.bytecode
+# bytecode, or with args.exe an executable. args are the command line
+# options. the optimizer, bytecode, cache, stats and native build modules
+# are only loaded when used, to keep startup quick
+def compileFile(source, output, args):
+    stats = NoStats()
+    if args.time_passes or args.stats_json:
+        from .stats import CompileStats
+        stats = CompileStats()
+
+    # the same source, compiler and options give the same output
+    cache = key = None
+    found = False
+    if args.cache and source is not None and os.path.isfile(source):
+        with stats.phase("cache"):
+            from .cache import CompileCache
+            cache = CompileCache(args.cache, args.cache_size * 2 ** 20)
+            with open(source, 'rb') as inputFile:
+                key = cache.key(inputFile, outputOptions(args))
+            key += ".ttb" if args.bytecode else ".exe" if args.exe else ".c"
+            found = cache.fetch(key, output)
+            if found and args.exe:
+                from .native import makeExecutable
+                makeExecutable(output)
+
+    if not found:
+        program = parseSource(source, args, stats)
+
+        if args.bytecode:
+            from .vm import BytecodeCompiler
+            with stats.phase("codegen"):
+                code = BytecodeCompiler().compile(program)
+            with stats.phase("write"):
+                with open(output, 'wb') as outputFile:
+                    code.save(outputFile)
+        elif args.exe:
+            # the C compiler starts up while the C is generated
+            from .native import NativeBuild
+            build = NativeBuild(output, args)
+            emitter = Emitter(output, stream=args.stream)
+            try:
+                with stats.phase("codegen"):
+                    cGenerator(emitter, args).program(program)
+            except BaseException:
+                build.cancel()
+                raise
+            with stats.phase("cc"):
+                build.build(emitter)
+        else:
+            # generate the C code
+            emitter = Emitter(output, stream=args.stream)
+            with stats.phase("codegen"):
+                cGenerator(emitter, args).program(program)
+            with stats.phase("write"):
+                emitter.writeFile() # write to output file
+
+        if cache is not None:
+            with stats.phase("store"):
+                cache.store(key, output)
+
+    if args.time_passes or args.stats_json:
+        stats.count("bytes", os.path.getsize(output))
+        stats.finish()
+        if args.time_passes:
+            stats.report(sys.stderr)
+        if args.stats_json:
+            stats.save(args.stats_json)
+
+# the C generator for the options in args
+def cGenerator(emitter, args):
+    return CGenerator(emitter, inferTypes=args.optimize, intInput=args.int_input,
+        peephole=args.optimize)
+
+# what compileFile measures with when there's no --time-passes
+class NoStats:
+    def phase(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+    def tokens(self, makeLexer, input):
+        return makeLexer(input)
+
+    def parsed(self, parser, program):
+        pass
+
+# the options that change what gets written, for the cache key. an
+# executable also depends on the C compiler building it
+def outputOptions(args):
+    return " ".join(option for option, used in (
+        ("-O", args.optimize),
+        ("--int-input", args.int_input),
+        ("--native", args.exe and args.native),
+        ("CC=" + os.environ.get("CC", "cc"), args.exe),
+    ) if used)
+
+# lex and parse the source file, returning the syntax tree. stats, when
+# given, times each phase
+def parseSource(source, args, stats=NoStats()):
+    # if no file given then quit otherwise open and read
+    if source is None:
+        sys.exit("Error: Compiler needs source file as argument.")
+    with open(source, 'r') as inputFile:
+        # the compact lexer streams the file, the others need all of it
+        with stats.phase("read"):
+            input = inputFile if args.lexer == 'compact' else inputFile.read()
+
+        # init lexer and parser
+        lexer = stats.tokens(lexers[args.lexer], input)
+        with stats.phase("parse"):
+            parser =  Parser(lexer, args.error_limit)
+
+            # start parser
+            program = parser.program()
+        stats.parsed(parser, program)
+
+    if args.optimize:
+        from .optimize import optimize
+        with stats.phase("optimize"):
+            optimize(program)
+    return program
@@ -0,0 +1,189 @@
+from .nodes import *
+from .values import *
+
+# Common subexpression elimination over straight-line code, by local value
+# numbering. in a run of LET, INPUT and PRINT statements, up to and
+# including the test of an IF that ends it, an expression worked out again
+# with none of its variables changed in between is read back rather than
+# worked out again. it comes from the variable a LET stored it in while
+# that still holds it, otherwise from a new variable set just before the
+# statement that first worked it out. only float expressions are shared,
+# since those are exactly what a float variable holds. a LABEL, GOTO or
+# loop ends the run
+class SubexpressionEliminator:
+    def program(self, program):
+        self.symbols = program.symbols
+        self.count = 0
+        program.statements = self.block(program.statements)
+
+    def block(self, statements):
+        result = []
+        self.start()
+        for node in statements:
+            kind = type(node)
+            if kind is Let or kind is Print:
+                node.expression = self.statement(node.expression, node, 'expression', len(result))
+                if kind is Let:
+                    self.assign(node.name)
+                    available = self.firsts.get(node.expression)
+                    if available is not None:
+                        # the LET holds the whole expression, later ones can read it
+                        available.name = node.name
+                        self.holding.setdefault(node.name, []).append(available)
+            elif kind is Input:
+                self.assign(node.name)
+            elif kind is If:
+                # the test runs once, straight after the code before it
+                node.comparison = self.statement(node.comparison, node, 'comparison', len(result))
+                self.finish(result)
+                node.body = self.block(node.body)
+                self.start()
+            elif kind is While or kind is Label or kind is Goto:
+                self.finish(result)
+                if kind is While:
+                    node.body = self.block(node.body)
+                self.start()
+            result.append(node)
+        self.finish(result)
+        return result
+
+    # begin a new run of straight-line code
+    def start(self):
+        # value number of each shape of expression, a variable's shape
+        # changes each time it is assigned to
+        self.shapes = {}
+        self.versions = {}
+        # expressions that can be read back, by value number
+        self.available = {}
+        # the available expressions each variable holds
+        self.holding = {}
+        # the available expression for each node that first worked it out
+        self.firsts = {}
+        # LETs of new variables to go in before each statement, by position
+        self.inserts = {}
+
+    # add the new variables' LETs in before the statements needing them
+    def finish(self, result):
+        for position in sorted(self.inserts, reverse=True):
+            # in the order their expressions were worked out, since later
+            # ones can read earlier ones
+            self.inserts[position].sort(key=lambda available: available.order)
+            result[position:position] = [Let(available.temporary, available.node)
+                for available in self.inserts[position]]
+        self.inserts = {}
+
+    # the expression of the statement at position, with what is available
+    # read back. parent.field is where it is
+    def statement(self, node, parent, field, position):
+        self.numbers = {}
+        self.number(node)
+        self.position = position
+        return self.expression(node, parent, field)
+
+    # value number and C type of node and everything in it, into self.numbers
+    def number(self, node):
+        kind = type(node)
+        if kind is Variable:
+            shape = (node.name, self.versions.get(node.name, 0))
+            ctype = FLOAT
+        elif kind is Number:
+            shape = node.text
+            ctype = typeOf(node)
+        elif kind is UnaryOp:
+            operand, ctype = self.number(node.operand)
+            shape = (node.op, operand)
+        else:
+            # a step at a time up the chain
+            bottom, operations = chain(node)
+            value, ctype = self.number(bottom)
+            for operation in operations:
+                right, rightType = self.number(operation.right)
+                ctype = INT if type(operation) is Comparison else max(ctype, rightType)
+                value = self.shapes.setdefault((operation.op, value, right), len(self.shapes))
+                self.numbers[id(operation)] = value, ctype
+            return value, ctype
+        value = self.shapes.setdefault(shape, len(self.shapes))
+        self.numbers[id(node)] = value, ctype
+        return value, ctype
+
+    # return node with the available expressions in it read back
+    def expression(self, node, parent, field):
+        # down the chain to the first part that is available or isn't an
+        # operation, then back up it a step at a time
+        operations = []
+        while type(node) is BinaryOp or type(node) is Comparison:
+            if self.available.get(self.numbers[id(node)][0]) is not None:
+                break
+            operations.append((node, parent, field))
+            node, parent, field = node.left, node, 'left'
+        result = self.operand(node, parent, field)
+        for node, parent, field in reversed(operations):
+            node.left = result
+            node.right = self.expression(node.right, node, 'right')
+            self.share(node, parent, field)
+            result = node
+        return result
+
+    # node, which isn't an operation that still needs reading back inside
+    def operand(self, node, parent, field):
+        kind = type(node)
+        if kind is Variable or kind is Number:
+            return node
+        available = self.available.get(self.numbers[id(node)][0])
+        if available is not None:
+            return self.reuse(available)
+        node.operand = self.expression(node.operand, node, 'operand')
+        self.share(node, parent, field)
+        return node
+
+    # make node, at parent.field, available to be read back later
+    def share(self, node, parent, field):
+        value, ctype = self.numbers[id(node)]
+        if type(node) is BinaryOp and ctype == FLOAT:
+            available = Available(node, parent, field, self.position, len(self.firsts))
+            self.available[value] = available
+            self.firsts[node] = available
+
+    # read an available expression back
+    def reuse(self, available):
+        if available.name is not None:
+            return Variable(available.name)
+        if available.temporary is None:
+            # store it where it was first worked out
+            available.temporary = self.temporary()
+            self.inserts.setdefault(available.position, []).append(available)
+            setattr(available.parent, available.field, Variable(available.temporary))
+        return Variable(available.temporary)
+
+    # after a LET or INPUT of name, expressions reading it get new value
+    # numbers and it no longer holds what it did
+    def assign(self, name):
+        self.versions[name] = self.versions.get(name, 0) + 1
+        for available in self.holding.pop(name, []):
+            if available.name == name:
+                available.name = None
+
+    # a new variable for the program
+    def temporary(self):
+        self.count += 1
+        while "_t" + str(self.count) in self.symbols:
+            self.count += 1
+        self.symbols.append("_t" + str(self.count))
+        return "_t" + str(self.count)
+
+
+# an expression that can be read back. node is where it was first worked
+# out, at parent.field in the statement at position, and order is when.
+# name is a variable that holds it, temporary the new one made for it once
+# it is read back
+class Available:
+    __slots__ = ('node', 'parent', 'field', 'position', 'order', 'name', 'temporary')
+
+    def __init__(self, node, parent, field, position, order):
+        self.node = node
+        self.parent = parent
+        self.field = field
+        self.position = position
+        self.order = order
+        self.name = None
+        self.temporary = None
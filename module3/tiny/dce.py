@@ -0,0 +1,121 @@
+from .nodes import *
+from .values import *
+
+# Dead code elimination.
+# removes statements nothing can reach (after a GOTO, in IF or WHILE bodies
+# whose test is constant false), LETs whose value is never read, and the
+# declarations of variables nothing uses any more. INPUT is always kept
+# since it still reads from stdin
+class DeadCodeEliminator:
+    def program(self, program):
+        changed = True
+        while changed:
+            self.targets = {node.name for node in walk(program.statements) if type(node) is Goto}
+            self.removed = 0
+            program.statements = self.reachable(program.statements)
+
+            # everything read anywhere is what might be live after a GOTO
+            self.everything = set()
+            for node in walk(program.statements):
+                self.reads(node, self.everything)
+            self.dead = set()
+            self.live(program.statements, set(), True)
+            program.statements = self.sweep(program.statements)
+            changed = self.removed > 0
+
+        # only declare what is still used
+        used = set()
+        for node in walk(program.statements):
+            self.reads(node, used)
+            if type(node) is Let or type(node) is Input:
+                used.add(node.name)
+        program.symbols = [name for name in program.symbols if name in used]
+
+    # true if a GOTO can land on this statement or inside it
+    def targeted(self, node):
+        if type(node) is Label:
+            return node.name in self.targets
+        if type(node) is If or type(node) is While:
+            return any(type(inner) is Label and inner.name in self.targets for inner in walk(node.body))
+        return False
+
+    # drop statements that can't run
+    def reachable(self, statements):
+        result = []
+        dead = False
+        for node in statements:
+            if dead and not self.targeted(node):
+                self.removed += 1
+                continue
+            dead = False
+
+            kind = type(node)
+            if kind is If or kind is While:
+                value = literal(node.comparison.text) if type(node.comparison) is Number else None
+                if value is not None and not value[0] and not self.targeted(node):
+                    self.removed += 1
+                    continue
+                node.body = self.reachable(node.body)
+                if kind is If and value is not None and value[0]:
+                    # IF that always runs is just its body
+                    result.extend(node.body)
+                    continue
+            result.append(node)
+            if kind is Goto:
+                dead = True
+        return result
+
+    # work backwards from live (what is read later) collecting dead LETs
+    # in self.dead when mark is set, returns what is live before statements
+    def live(self, statements, live, mark):
+        for node in reversed(statements):
+            kind = type(node)
+            if kind is Let:
+                if node.name not in live:
+                    if mark:
+                        self.dead.add(id(node))
+                    continue
+                live = live - {node.name}
+                uses(node.expression, live)
+            elif kind is Input:
+                # at the end of input scanf leaves the variable as it was,
+                # so a value stored before INPUT can still be read after it
+                pass
+            elif kind is Print:
+                live = uses(node.expression, set(live))
+            elif kind is Goto:
+                live = set(self.everything)
+            elif kind is If:
+                live = uses(node.comparison, live | self.live(node.body, live, mark))
+            elif kind is While:
+                # the test runs before the body and after each pass through it
+                head = uses(node.comparison, set(live))
+                while True:
+                    after = uses(node.comparison, live | self.live(node.body, head, False))
+                    if after == head:
+                        break
+                    head = after
+                if mark:
+                    self.live(node.body, head, True)
+                live = head
+        return live
+
+    # remove the LETs live() marked
+    def sweep(self, statements):
+        result = []
+        for node in statements:
+            if id(node) in self.dead:
+                self.removed += 1
+                continue
+            if type(node) is If or type(node) is While:
+                node.body = self.sweep(node.body)
+            result.append(node)
+        return result
+
+    # add the variables a statement itself reads to names
+    def reads(self, node, names):
+        kind = type(node)
+        if kind is Let or kind is Print:
+            uses(node.expression, names)
+        elif kind is If or kind is While:
+            uses(node.comparison, names)
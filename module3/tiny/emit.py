@@ -0,0 +1,44 @@
+# Keeps track of generated code and outputs it
+# code is kept as a list of chunks, or with stream=True written straight to
+# a temp file, and the header is only put in front of it when writing out
+class Emitter:
+  def __init__(self, fullPath, stream=False):
+    self.fullPath = fullPath
+    self.header = []
+    self.stream = stream
+    if stream:
+      import tempfile # only loaded when streaming, to keep startup quick
+      self.code = tempfile.TemporaryFile('w+')
+      self.write = self.code.write
+    else:
+      self.code = []
+      self.write = self.code.append
+
+  def emit(self, code):
+    self.write(code)
+
+  def emitLine(self, code):
+    self.write(code + '\n')
+
+  def headerLine(self, code):
+    self.header.append(code + '\n')
+
+  # write header then code to an open file
+  def writeTo(self, outputFile):
+    outputFile.writelines(self.header)
+    if self.stream:
+      import shutil
+      self.code.seek(0)
+      shutil.copyfileobj(self.code, outputFile)
+    else:
+      outputFile.writelines(self.code)
+
+  def writeFile(self):
+    with open(self.fullPath, 'w') as outputFile:
+      self.writeTo(outputFile)
+    self.close()
+
+  # done with the code, a streamed one's temp file is removed
+  def close(self):
+    if self.stream:
+      self.code.close()
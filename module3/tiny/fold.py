@@ -0,0 +1,111 @@
+import math
+from .nodes import *
+from .values import *
+
+# Constant folding and propagation.
+# known maps each variable whose value is certain at the current point to
+# that value (already rounded to a C float). it is emptied at a LABEL or
+# after a GOTO since control can arrive there from code we didn't follow
+class ConstantFolder:
+    def program(self, program):
+        program.statements = self.block(program.statements, {})
+
+    # fold a list of statements, known ends up as what holds after them
+    def block(self, statements, known):
+        result = []
+        for statement in statements:
+            self.statement(statement, known, result)
+        return result
+
+    def statement(self, node, known, result):
+        kind = type(node)
+        if kind is Let:
+            node.expression, value = self.fold(node.expression, known)
+            known.pop(node.name, None)
+            if value is not None:
+                try:
+                    known[node.name] = convert(value[0], value[1], FLOAT)
+                except OverflowError:
+                    pass
+        elif kind is Input:
+            known.pop(node.name, None)
+        elif kind is Print:
+            node.expression = self.fold(node.expression, known)[0]
+        elif kind is Label or kind is Goto:
+            known.clear()
+        elif kind is If:
+            comparison, value = self.fold(node.comparison, known)
+            if value is not None:
+                # always runs, or never runs and nothing can jump into it
+                if value[0]:
+                    result.extend(self.block(node.body, known))
+                    return
+                if not hasLabel(node.body):
+                    return
+            node.comparison = comparison
+            inner = dict(known)
+            node.body = self.block(node.body, inner)
+            # after the IF only what both ways through agree on is known
+            for name, value in list(known.items()):
+                if name not in inner or not same(inner[name], value):
+                    del known[name]
+        elif kind is While:
+            # drop a loop that never runs
+            value = self.fold(node.comparison, known)[1]
+            if value is not None and not value[0] and not hasLabel(node.body):
+                return
+
+            # the loop test also runs after the body, so forget whatever
+            # the body changes, or everything if code can jump into it
+            if hasLabel(node.body):
+                known.clear()
+            for name in assigned(node.body):
+                known.pop(name, None)
+            node.comparison = self.fold(node.comparison, known)[0]
+            node.body = self.block(node.body, dict(known))
+        result.append(node)
+
+    # return the folded expression and its (value, type) if it is constant
+    def fold(self, node, known):
+        kind = type(node)
+        if kind is Number:
+            return node, literal(node.text)
+        if kind is Variable:
+            if node.name in known:
+                value = known[node.name]
+                return Number(literalText(value, FLOAT)), (value, FLOAT)
+            return node, None
+        if kind is UnaryOp:
+            operand, value = self.fold(node.operand, known)
+            if value is not None:
+                value = unary(node.op, *value)
+                if value is not None:
+                    return Number(literalText(*value)), value
+            if operand is node.operand:
+                return node, None
+            return UnaryOp(node.op, operand), None
+
+        # binary op or comparison, a step at a time up the chain
+        bottom, operations = chain(node)
+        node, value = self.fold(bottom, known)
+        for operation in operations:
+            node, value = self.operation(operation, node, value, known)
+        return node, value
+
+    # fold operation given its left side, already folded to left with the
+    # (value, type) leftValue
+    def operation(self, node, left, leftValue, known):
+        right, rightValue = self.fold(node.right, known)
+        if leftValue is not None and rightValue is not None:
+            operation = compare if type(node) is Comparison else arithmetic
+            value = operation(node.op, *leftValue, *rightValue)
+            if value is not None:
+                return Number(literalText(*value)), value
+        if left is node.left and right is node.right:
+            return node, None
+        return type(node)(left, node.op, right), None
+
+
+# equal values with the same sign, so 0.0 and -0.0 aren't mixed up
+def same(a, b):
+    return a == b and math.copysign(1, a) == math.copysign(1, b)
@@ -0,0 +1,76 @@
+import random
+
+# Makes large, valid Teeny Tiny programs for benchmarks. the same seed
+# and size always give the same program, with nested IF and WHILE, long
+# expressions, lots of variables and LABEL/GOTO between them. the programs
+# only have to compile, loops aren't made to end
+class ProgramGenerator:
+    def __init__(self, seed=0, statements=10000, maxDepth=6, maxTerms=12):
+        self.random = random.Random(seed)
+        self.statements = statements
+        self.maxDepth = maxDepth
+        self.maxTerms = maxTerms
+
+    def program(self):
+        self.lines = []
+        self.variables = []
+        self.labels = []
+        self.count = 0
+        while self.count < self.statements:
+            self.statement(0)
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, depth, text):
+        self.lines.append("    " * depth + text)
+        self.count += 1
+
+    def statement(self, depth):
+        choice = self.random.random()
+        if not self.variables or choice < 0.35:
+            # a new variable now and then, otherwise reuse one
+            if not self.variables or self.random.random() < 0.2:
+                name = "v" + str(len(self.variables))
+                self.variables.append(name)
+            else:
+                name = self.random.choice(self.variables)
+            self.emit(depth, "LET " + name + " = " + self.expression())
+        elif choice < 0.45:
+            self.emit(depth, "PRINT " + self.expression())
+        elif choice < 0.5:
+            self.emit(depth, "PRINT \"line " + str(self.count) + "\"")
+        elif choice < 0.53:
+            self.emit(depth, "INPUT " + self.random.choice(self.variables))
+        elif choice < 0.58:
+            name = "l" + str(len(self.labels))
+            self.labels.append(name)
+            self.emit(depth, "LABEL " + name)
+        elif choice < 0.62 and self.labels:
+            self.emit(depth, "GOTO " + self.random.choice(self.labels))
+        elif depth < self.maxDepth:
+            keyword = "IF" if choice < 0.85 else "WHILE"
+            self.emit(depth, keyword + " " + self.comparison() + (" THEN" if keyword == "IF" else " REPEAT"))
+            for _ in range(self.random.randint(1, 6)):
+                self.statement(depth + 1)
+            self.emit(depth, "ENDIF" if keyword == "IF" else "ENDWHILE")
+        else:
+            self.emit(depth, "PRINT " + self.expression())
+
+    def comparison(self):
+        text = self.expression()
+        for _ in range(self.random.randint(1, 2)):
+            text += " " + self.random.choice(["==", "!=", "<", "<=", ">", ">="]) + " " + self.expression()
+        return text
+
+    def expression(self):
+        text = self.unary()
+        for _ in range(self.random.randint(0, self.maxTerms - 1)):
+            text += " " + self.random.choice("+-*/") + " " + self.unary()
+        return text
+
+    def unary(self):
+        sign = self.random.choice(["", "", "", "-", "+"])
+        if self.variables and self.random.random() < 0.6:
+            return sign + self.random.choice(self.variables)
+        if self.random.random() < 0.7:
+            return sign + str(self.random.randint(0, 1000))
+        return sign + str(self.random.randint(0, 100)) + "." + str(self.random.randint(0, 99))
@@ -0,0 +1,313 @@
+import heapq
+import math
+from .nodes import *
+from .values import *
+from .cfg import *
+
+# every integer up to this size is exact in a C float
+LIMIT = 2 ** 24
+
+# the ends of a C long
+LONG_MIN = -2 ** 63
+LONG_MAX = 2 ** 63 - 1
+
+# the test that holds when a comparison is false
+negated = {'==': '!=', '!=': '==', '<': '>=', '<=': '>', '>': '<=', '>=': '<'}
+
+# the same test with its sides swapped
+swapped = {'==': '==', '!=': '!=', '<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+
+# Type inference for the C backend.
+# finds the variables that only ever hold whole numbers small enough that
+# a float holds them exactly, so they can be a C long and give the same
+# results faster. ranges are (low, high, negativeZero) intervals worked
+# out over the control flow graph, with loop tests narrowing them, and None
+# where a value might not be a whole number. negativeZero is set if the
+# float math could give -0, which a long can't hold. a variable is a long
+# if every value stored in it is in range and it is never read by INPUT. an expression is
+# worked out in integer math if its operands are and its range fits too,
+# which gives exactly what the float math would have.
+# with intInput INPUT reads whole numbers, and whole numbers no longer
+# have to fit in a float, they are just exact as longs. they still have
+# to fit in a long, so nothing wraps
+class TypeInference:
+    def __init__(self, intInput=False):
+        self.intInput = intInput
+        self.low, self.high = (LONG_MIN, LONG_MAX) if intInput else (-LIMIT, LIMIT)
+
+    def program(self, program):
+        candidates = set(program.symbols)
+        if not self.intInput:
+            candidates -= {node.name for node in walk(program.statements) if type(node) is Input}
+        blocks = controlFlow(program.statements)
+
+        # drop variables that go out of range until what is left is sound
+        while True:
+            self.candidates = candidates
+            self.recording = False
+            entries = self.fixpoint(blocks)
+
+            # go through once more from the final states to get the ranges
+            self.ranges = {}
+            self.stored = {name: (0, 0, False) for name in candidates}
+            self.recording = True
+            for block, state in zip(blocks, entries):
+                if state is not None:
+                    self.transfer(block, state)
+                    if block.test is not None:
+                        self.range(block.test, state)
+
+            bad = {name for name in candidates if not self.fits(self.stored[name])}
+            if not bad:
+                break
+            candidates = candidates - bad
+
+        self.longs = candidates
+        self.integrals = {}
+        return self
+
+    # true if node is a whole number the generated C can work out as one.
+    # kept for each node of a chain, which is asked about at every step up
+    def integral(self, node):
+        operations = []
+        while type(node) is BinaryOp and id(node) not in self.integrals:
+            operations.append(node)
+            node = node.left
+        kind = type(node)
+        if kind is BinaryOp:
+            result = self.integrals[id(node)]
+        elif kind is Variable:
+            result = node.name in self.longs
+        elif kind is Number:
+            result = typeOf(node) == INT
+        elif kind is UnaryOp:
+            result = self.integral(node.operand) and self.fits(self.ranges.get(id(node)))
+        else:
+            result = False
+        for operation in reversed(operations):
+            result = (result and operation.op != '/' and self.integral(operation.right)
+                and self.fits(self.ranges.get(id(operation))))
+            self.integrals[id(operation)] = result
+        return result
+
+    def fits(self, interval):
+        return (interval is not None and self.low <= interval[0] and interval[1] <= self.high
+            and not interval[2])
+
+    # state on entry to each block, None for blocks that can't run.
+    # widens ranges that keep growing round a loop, then tightens them
+    # again by going round a few more times
+    def fixpoint(self, blocks):
+        start = {name: (0, 0, False) for name in self.candidates}
+        entries = [None] * len(blocks)
+        entries[0] = start
+        visits = [0] * len(blocks)
+        # lowest block first, so code before a loop settles before it
+        pending = [0]
+        queued = {0}
+        while pending:
+            index = heapq.heappop(pending)
+            queued.remove(index)
+            for target, state in self.exits(blocks[index], entries[index]):
+                old = entries[target]
+                new = state if old is None else joinStates(old, state)
+                if new != old:
+                    visits[target] += 1
+                    if visits[target] > 2:
+                        new = widenStates(old, new)
+                    entries[target] = new
+                    if target not in queued:
+                        queued.add(target)
+                        heapq.heappush(pending, target)
+
+        for _ in range(3):
+            narrowed = [None] * len(blocks)
+            narrowed[0] = start
+            for block, state in zip(blocks, entries):
+                if state is None:
+                    continue
+                for target, state in self.exits(block, state):
+                    old = narrowed[target]
+                    narrowed[target] = state if old is None else joinStates(old, state)
+            entries = narrowed
+        return entries
+
+    # (block, state) for each way out of block given the state going in
+    def exits(self, block, state):
+        state = self.transfer(block, state)
+        if block.test is None:
+            edges = [(block.target, state)]
+        else:
+            edges = [
+                (block.target, self.refine(block.test, state, True)),
+                (block.otherwise, self.refine(block.test, state, False)),
+            ]
+        return [(target, state) for target, state in edges
+            if target is not None and state is not None]
+
+    # state after a block's statements
+    def transfer(self, block, state):
+        state = dict(state)
+        for node in block.statements:
+            kind = type(node)
+            if kind is Let:
+                value = self.range(node.expression, state)
+                if node.name in self.candidates:
+                    state[node.name] = value
+                    if self.recording:
+                        self.stored[node.name] = join(self.stored[node.name], value)
+            elif kind is Input:
+                if node.name in self.candidates:
+                    state[node.name] = (LONG_MIN, LONG_MAX, False)
+            elif kind is Print:
+                self.range(node.expression, state)
+        return state
+
+    # state given test came out as truth, None if it can't
+    def refine(self, test, state, truth):
+        if type(test) is Number:
+            value = literal(test.text)
+            return state if value is None or bool(value[0]) == truth else None
+        if type(test) is not Comparison:
+            return state
+        if (type(test.left) is Comparison and test.op in ('==', '!=') and type(test.right) is Number
+                and literal(test.right.text) == (0, INT)):
+            # (test) == 0 is the test coming out false
+            return self.refine(test.left, state, truth != (test.op == '=='))
+
+        op = test.op if truth else negated[test.op]
+        state = dict(state)
+        for side, other, sideOp in ((test.left, test.right, op), (test.right, test.left, swapped[op])):
+            if type(side) is not Variable or state.get(side.name) is None:
+                continue
+            if type(other) is Number and literal(other.text) is not None:
+                value = literal(other.text)[0]
+                bound = (value, value, False)
+            else:
+                bound = self.range(other, state)
+            if bound is None:
+                continue
+            state[side.name] = narrow(state[side.name], sideOp, bound)
+            if state[side.name] is None:
+                return None
+        return state
+
+    # range of an expression, None if it might not be a whole number.
+    # past LIMIT the float math rounds, and past a long's ends the long
+    # math wraps, so those ends are left open
+    def range(self, node, state):
+        kind = type(node)
+        if kind is Variable:
+            value = state.get(node.name)
+        elif kind is Number:
+            value = literal(node.text)
+            if value is None:
+                value = (int(node.text), int(node.text), False)
+            else:
+                value = (value[0], value[0], False) if value[1] == INT else None
+        elif kind is UnaryOp:
+            value = self.range(node.operand, state)
+            if value is not None and node.op == '-':
+                # -0 is -0
+                value = (-value[1], -value[0], value[0] <= 0 <= value[1])
+        else:
+            # a step at a time up the chain
+            bottom, operations = chain(node)
+            value = self.range(bottom, state)
+            for operation in operations:
+                right = self.range(operation.right, state)
+                if type(operation) is BinaryOp and operation.op != '/' and value is not None and right is not None:
+                    value = arithmeticRange(operation.op, value, right, self.low, self.high)
+                else:
+                    value = None
+                self.record(operation, value)
+            return value
+
+        self.record(node, value)
+        return value
+
+    # keep the range node has had, for integral
+    def record(self, node, value):
+        if self.recording:
+            key = id(node)
+            self.ranges[key] = join(self.ranges[key], value) if key in self.ranges else value
+
+
+def join(left, right):
+    if left is None or right is None:
+        return None
+    return (min(left[0], right[0]), max(left[1], right[1]), left[2] or right[2])
+
+
+def joinStates(old, new):
+    return {name: join(old[name], new[name]) for name in old}
+
+
+# let any end that moved go to infinity so loops settle
+def widenStates(old, new):
+    result = {}
+    for name in old:
+        if old[name] is None or new[name] is None:
+            result[name] = None
+        else:
+            low = old[name][0] if new[name][0] >= old[name][0] else -math.inf
+            high = old[name][1] if new[name][1] <= old[name][1] else math.inf
+            result[name] = (low, high, old[name][2] or new[name][2])
+    return result
+
+
+# range of left op right for + - *, with ends past minimum and maximum open
+def arithmeticRange(op, left, right, minimum, maximum):
+    leftZero = left[0] <= 0 <= left[1]
+    rightZero = right[0] <= 0 <= right[1]
+    if op == '+':
+        # only -0 + -0 is -0
+        low, high = left[0] + right[0], left[1] + right[1]
+        negativeZero = left[2] and right[2]
+    elif op == '-':
+        # -0 - 0 is -0
+        low, high = left[0] - right[1], left[1] - right[0]
+        negativeZero = left[2] and rightZero
+    else:
+        # a zero times something of the other sign
+        products = [multiply(a, b) for a in left[:2] for b in right[:2]]
+        low, high = min(products), max(products)
+        negativeZero = ((leftZero and (right[0] < 0 or left[2] or right[2]))
+            or (rightZero and (left[0] < 0 or left[2] or right[2])))
+    if low < minimum:
+        low = -math.inf
+    if high > maximum:
+        high = math.inf
+    return (low, high, negativeZero)
+
+
+# a * b where an infinite end times 0 is 0
+def multiply(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return a * b
+
+
+# range of a whole number in interval that is op some value in bound,
+# None if there isn't one
+def narrow(interval, op, bound):
+    low, high, negativeZero = interval
+    if op in ('<', '<=', '=='):
+        limit = bound[1]
+        if math.isfinite(limit):
+            limit = math.ceil(limit) - 1 if op == '<' else math.floor(limit)
+        high = min(high, limit)
+    if op in ('>', '>=', '=='):
+        limit = bound[0]
+        if math.isfinite(limit):
+            limit = math.floor(limit) + 1 if op == '>' else math.ceil(limit)
+        low = max(low, limit)
+    if op == '!=' and bound[0] == bound[1]:
+        if low == bound[0]:
+            low += 1
+        if high == bound[0]:
+            high -= 1
+    if low > high:
+        return None
+    return (low, high, negativeZero and low <= 0 <= high)
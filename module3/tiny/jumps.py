@@ -0,0 +1,130 @@
+from .nodes import *
+from .values import *
+
+# the opposite test for the comparisons where that is exact, < and the
+# others aren't since with a nan both a < b and a >= b are false
+opposite = {'==': '!=', '!=': '=='}
+
+
+# Jump threading and goto loops.
+# a GOTO to a LABEL that is followed by another GOTO goes straight to where
+# that one goes, and a GOTO to where the code would go next anyway is
+# dropped. then loops made out of GOTOs become WHILE loops, so the loop pass
+# and the C compiler see them as loops and constant folding doesn't have to
+# forget everything at their LABEL:
+#   LABEL top / IF test THEN ... GOTO top ENDIF
+#   LABEL top / IF test THEN GOTO out ENDIF / ... / GOTO top
+#   LABEL top / ... / GOTO top
+# the LABEL stays in front of the WHILE, where other GOTOs to it still go
+# to the loop test. LABELs nothing goes to any more are left for the
+# peephole pass to drop
+class JumpThreader:
+    def program(self, program):
+        self.follow(program.statements)
+        for node in walk(program.statements):
+            if type(node) is Goto:
+                node.name = self.destination(node.name)
+        program.statements = self.loops(program.statements)
+
+        # what's left of a loop can be a GOTO to just after it
+        self.follow(program.statements)
+        program.statements = self.straight(program.statements, None)
+
+    # work out self.following, the statement that runs first after each
+    # LABEL, None at the end of the program
+    def follow(self, statements):
+        self.following = {}
+        self.scan(statements, None)
+
+    # after is what runs once statements are done, a WHILE for its test
+    def scan(self, statements, after):
+        for node in reversed(statements):
+            kind = type(node)
+            if kind is Label:
+                self.following[node.name] = after
+                continue
+            if kind is If:
+                self.scan(node.body, after)
+            elif kind is While:
+                self.scan(node.body, node)
+            after = node
+
+    # the label a GOTO to name ends up at after any GOTOs straight after it
+    def destination(self, name):
+        seen = {name}
+        node = self.following.get(name)
+        while type(node) is Goto and node.name not in seen:
+            name = node.name
+            seen.add(name)
+            node = self.following.get(name)
+        return name
+
+    # statements with the loops made of GOTOs in them turned into WHILEs
+    def loops(self, statements):
+        result = []
+        index = 0
+        while index < len(statements):
+            node = statements[index]
+            kind = type(node)
+            if kind is If or kind is While:
+                node.body = self.loops(node.body)
+            elif kind is Label:
+                loop = self.loop(statements, index)
+                if loop is not None:
+                    # the LABEL, then the loop in place of what it was made of
+                    result.append(node)
+                    index = loop[0]
+                    result.extend(self.loops(loop[1]))
+                    continue
+            result.append(node)
+            index += 1
+        return result
+
+    # (index after it, statements) for the loop starting at the LABEL at
+    # statements[index], None if there isn't one
+    def loop(self, statements, index):
+        name = statements[index].name
+        first = statements[index + 1] if index + 1 < len(statements) else None
+
+        # IF test THEN ... GOTO top ENDIF
+        if type(first) is If and first.body and type(first.body[-1]) is Goto and first.body[-1].name == name:
+            return index + 2, [While(first.comparison, first.body[:-1])]
+
+        end = next((end for end in range(index + 1, len(statements))
+            if type(statements[end]) is Goto and statements[end].name == name), None)
+        if end is None:
+            return None
+        body = statements[index + 1:end]
+
+        # IF test THEN GOTO out ENDIF ... GOTO top
+        if type(first) is If and len(first.body) == 1 and type(first.body[0]) is Goto:
+            out = first.body[0]
+            return end + 1, [While(negate(first.comparison), body[1:]), out]
+
+        # ... GOTO top, which only stops at a GOTO out
+        return end + 1, [While(Number('1'), body)]
+
+    # drop GOTOs to where the code goes next anyway, after is what runs
+    # once statements are done
+    def straight(self, statements, after):
+        result = []
+        for node in reversed(statements):
+            kind = type(node)
+            if kind is Goto and self.following[node.name] is after:
+                continue
+            if kind is If:
+                node.body = self.straight(node.body, after)
+            elif kind is While:
+                node.body = self.straight(node.body, node)
+            result.append(node)
+            if kind is not Label:
+                after = node
+        result.reverse()
+        return result
+
+
+# a test true exactly when comparison is false
+def negate(comparison):
+    if type(comparison) is Comparison and comparison.op in opposite:
+        return Comparison(comparison.left, opposite[comparison.op], comparison.right)
+    return Comparison(comparison, '==', Number('0'))
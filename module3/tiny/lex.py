@@ -0,0 +1,493 @@
+import enum
+import re
+import sys
+from array import array
+from bisect import bisect_left
+
+class Lexer:
+    def __init__(self, input):
+        # set init position and char call next char
+        self.source = input + '\n'
+        self.lines = LineIndex(self.source, end=len(input))
+        self.curChar = ''
+        self.curPos = -1
+        self.nextChar()
+
+    # prints out source
+    def print(self):
+        print()
+        print(self.source, end="")
+
+    # Processes the next char
+    def nextChar(self):
+        self.curPos += 1
+        if self.curPos >= len(self.source):
+            self.curChar = '\0'
+        else:
+            self.curChar = self.source[self.curPos]
+
+    # Return the next char
+    def peek(self):
+        return '\0' if self.curPos + 1 >= len(self.source) else self.source[self.curPos + 1]
+
+    # stop at an error. the rest of the line is skipped first, so whoever
+    # catches the LexError can carry on lexing from its newline
+    def abort(self, message):
+        line, column = self.locate(self.curPos)
+        while self.curChar != '\n' and self.curChar != '\0':
+            self.nextChar()
+        raise LexError("Lexing error on line " + str(line) + ", column " + str(column) + ". " + message)
+
+    # line and column of an offset in the source, counting from 1
+    def locate(self, offset):
+        return self.lines.locate(offset)
+
+    # line and column a token starts at
+    def location(self, token):
+        return self.lines.locate(token.start)
+
+    # skip all white space except newline
+    def skipWhitespace(self):
+        while self.curChar == ' ' or self.curChar == '\t' or self.curChar == '\r':
+            self.nextChar()
+
+    # skip comments
+    def skipComment(self):
+        if self.curChar == '#':
+            while self.curChar != '\n':
+                self.nextChar()
+
+    # return next token
+    def getToken(self):
+        self.skipWhitespace()
+        self.skipComment()
+        token = None
+        start = self.curPos
+
+        # check what the first char
+        # if multiple char operator, num, identifier, or keyword rest
+        if self.curChar == '+':
+            token = Token(self.curChar, TokenType.PLUS)
+        elif self.curChar == '-':
+            token = Token(self.curChar, TokenType.MINUS)
+        elif self.curChar == '*':
+            token = Token(self.curChar, TokenType.ASTERISK)
+        elif self.curChar == '/':
+            token = Token(self.curChar, TokenType.SLASH)
+        elif self.curChar == '\n':
+            token = Token(self.curChar, TokenType.NEWLINE)
+        elif self.curChar == '\0':
+            token = Token('', TokenType.EOF)
+            # at the end of the input, not past the newline added to it
+            start = min(start, len(self.source) - 1)
+        elif self.curChar == '=':
+            if self.peek() == '=':
+                lastChar = self.curChar
+                self.nextChar()
+                token = Token(lastChar + self.curChar, TokenType.EQEQ)
+            else:
+                token = Token(self.curChar, TokenType.EQ)
+        elif self.curChar == '>':
+            if self.peek() == '=':
+                lastChar = self.curChar
+                self.nextChar()
+                token = Token(lastChar + self.curChar, TokenType.GTEQ)
+            else:
+                token = Token(self.curChar, TokenType.GT)
+        elif self.curChar == '<':
+            if self.peek() == '=':
+                lastChar = self.curChar
+                self.nextChar()
+                token = Token(lastChar + self.curChar, TokenType.LTEQ)
+            else:
+                token = Token(self.curChar, TokenType.LT)
+        elif self.curChar == '!':
+            if self.peek() == '=':
+                lastChar = self.curChar
+                self.nextChar()
+                token = Token(lastChar + self.curChar, TokenType.NOTEQ)
+            else:
+                self.abort("Expected !=, got !" + self.peek())
+        elif self.curChar == '\"':
+            # used to get a string when a quote is found
+            self.nextChar()
+            startPos = self.curPos
+
+            while self.curChar != '\"':
+                # don't allow special chars ex. \n. \r, %, etc
+                if self.curChar == '\r' or self.curChar == '\n' or self.curChar == '\t' or self.curChar == '\\' or self.curChar == '%':
+                    self.abort("Illegal character used in string.")
+                self.nextChar()
+
+            tokenText = self.source[startPos : self.curPos]
+            token = Token(tokenText, TokenType.STRING)
+
+        elif self.curChar.isdigit():
+            # used when a number is encountered
+            # does not support numbers like .1 or 1.
+            startPos = self.curPos
+
+            while self.peek().isdigit():
+                self.nextChar()
+            
+            if self.peek() == '.':
+                self.nextChar()
+                if not self.peek().isdigit():
+                    self.abort("Illegal char in number.")
+                while self.peek().isdigit():
+                    self.nextChar()
+
+            tokenText =  self.source[startPos : self.curPos  + 1]
+            token = Token(tokenText, TokenType.NUMBER)
+
+        elif self.curChar.isalpha():
+            # determines if it input is a keyword or identifier
+            startPos = self.curPos
+            while self.peek().isalnum():
+                self.nextChar()
+
+            tokenText = self.source[startPos : self.curPos + 1]
+            keyword = Token.checkIfKeyword(tokenText)
+            if keyword == None:  # identifier
+                token = Token(tokenText, TokenType.IDENT)
+            else: # keyword
+                token = Token(tokenText, keyword)
+
+        else:
+            # unkown token
+            self.abort("Unknown token: " + self.curChar)
+
+        token.start = start
+        self.nextChar()
+        return token
+
+
+
+# Lexer that scans a whole token with one compiled regex per call instead of
+# walking the source a char at a time. Anything the pattern doesn't accept
+# (errors, non-ascii, stray '\0') falls back to the char lexer so tokens
+# and error messages are the same.
+class RegexLexer(Lexer):
+    # whitespace and comment, then one token. numbers followed by '.' and
+    # words touching non-ascii chars are left to the slow path.
+    # compiled by the first lexer that needs it (re caches it after that),
+    # since compiling it is most of the cost of importing this module
+    pattern = (
+        r'[ \t\r]*(?:#[^\n]*)?(?:'
+        r'(?P<NUMBER>[0-9]+(?:\.[0-9]+)?(?![.0-9\x80-\U0010ffff]))'
+        r'|(?P<IDENT>[A-Za-z][A-Za-z0-9]*(?![A-Za-z0-9\x80-\U0010ffff]))'
+        r'|"(?P<STRING>[^"\r\n\t\\%]*)"'
+        r'|(?P<OP>==|!=|>=|<=|[-+*/\n=<>]))')
+
+    def __init__(self, input):
+        super().__init__(input)
+        self.match = re.compile(self.pattern).match
+
+    # return next token
+    def getToken(self):
+        found = self.match(self.source, self.curPos)
+        if found is None:
+            return super().getToken()
+
+        group = found.lastgroup
+        text = found.group(group)
+        if group == 'IDENT':
+            token = Token(text, keywords.get(text, TokenType.IDENT))
+        elif group == 'OP':
+            token = Token(text, operators[text])
+        else:
+            token = Token(text, TokenType[group])
+        token.start = found.start(group) - (group == 'STRING')
+
+        # leave cur char just past the token like nextChar would
+        self.curPos = found.end()
+        self.curChar = self.source[self.curPos] if self.curPos < len(self.source) else '\0'
+        return token
+
+
+# raised by the lexers on an error. the compact lexer holds on to it while
+# it fills its buffer, so it only shows once the parser reaches it
+class LexError(Exception):
+    pass
+
+
+# stands in for a lexer, handing out tokens lexer made earlier. tokens ends
+# with the EOF token, which repeats since the parser looks one past it. a
+# LexError in tokens is raised when it's reached
+class ReplayLexer:
+    def __init__(self, tokens, lexer):
+        self.tokens = tokens
+        self.position = 0
+        self.location = lexer.location
+
+    def getToken(self):
+        token = self.tokens[min(self.position, len(self.tokens) - 1)]
+        self.position += 1
+        if type(token) is LexError:
+            raise token
+        return token
+
+
+# Lexer that tokenizes into TokenBuffers and hands the parser small
+# TokenView objects instead of building a Token per token. input can be a
+# string, a text or binary file object or an mmap; it is read a chunk of
+# whole lines at a time so only the chunks still being parsed are in memory
+class CompactLexer(RegexLexer):
+    def __init__(self, input, chunkSize=1 << 16):
+        self.match = re.compile(self.pattern).match
+        self.chunks = sourceChunks(input, chunkSize)
+        self.error = None
+        self.line = 1
+        self.source = ''
+        self.nextBuffer()
+
+    # tokenize the next chunk into a fresh buffer
+    def nextBuffer(self):
+        self.line += self.source.count('\n')
+        self.source, self.lastChunk = next(self.chunks)
+        self.buffer = TokenBuffer(self.source, self.line,
+            len(self.source) - 1 if self.lastChunk else None)
+        self.index = 0
+        self.fill(0)
+
+    # scan the chunk from pos into the buffer, stopping at its end, EOF or
+    # an error
+    def fill(self, pos):
+        source = self.source
+        buffer = self.buffer
+        match = self.match
+        appendKind = buffer.kinds.append
+        appendStart = buffer.starts.append
+        appendEnd = buffer.ends.append
+        groupKinds = {'NUMBER': TokenType.NUMBER.value, 'STRING': TokenType.STRING.value}
+        while True:
+            found = match(source, pos)
+            if found is not None:
+                group = found.lastgroup
+                start, end = found.span(group)
+                if group == 'IDENT':
+                    appendKind(keywordValues.get(source[start:end], identValue))
+                elif group == 'OP':
+                    appendKind(operatorValues[source[start:end]])
+                else:
+                    appendKind(groupKinds[group])
+                appendStart(start)
+                appendEnd(end)
+                pos = found.end()
+                continue
+
+            # the rest of the file is in later chunks
+            if pos == len(source) and not self.lastChunk:
+                return
+
+            # slow path, the char lexer works out the token or the error
+            self.curPos = pos - 1
+            self.nextChar()
+            try:
+                token = Lexer.getToken(self)
+            except LexError as error:
+                # abort left curPos at the newline ending the bad line
+                self.error = error
+                self.resume = self.curPos
+                return
+            start = token.start + (token.kind == TokenType.STRING)
+            buffer.append(token.kind.value, start, start + len(token.text))
+            if token.kind == TokenType.EOF:
+                return
+            pos = self.curPos
+
+    # return next token
+    def getToken(self):
+        index = self.index
+        while index == len(self.buffer.kinds):
+            # ran off the scanned tokens, either an error, EOF or a new chunk
+            if self.error is not None:
+                # the tokens after the bad line are there for the next call
+                error = self.error
+                self.error = None
+                self.fill(self.resume)
+                raise error
+            if index and self.buffer.kinds[index - 1] == TokenType.EOF.value:
+                return TokenView(self.buffer, index - 1)
+            self.nextBuffer()
+            index = 0
+        self.index = index + 1
+        return TokenView(self.buffer, index)
+
+    # offsets are in the chunk being scanned
+    def locate(self, offset):
+        return self.buffer.lines.locate(offset)
+
+    def location(self, token):
+        return token.buffer.lines.locate(token.start)
+
+
+# yields (text, isLast) chunks of input that each end on a line break. a
+# token never spans lines, so each chunk can be tokenized on its own. the
+# last chunk gets the same extra newline Lexer adds to the source, and
+# always holds the input's last line so its LineIndex can place EOF on it
+def sourceChunks(input, chunkSize):
+    if isinstance(input, str):
+        pos = 0
+        while len(input) - pos > chunkSize:
+            cut = input.find('\n', pos + chunkSize) + 1
+            if cut == 0 or cut == len(input):
+                break
+            yield input[pos:cut], False
+            pos = cut
+        yield input[pos:] + '\n', True
+        return
+
+    pending = None
+    held = None
+    while True:
+        data = input.read(chunkSize)
+        if not data:
+            break
+        if pending:
+            data = pending + data
+        newline = b'\n' if isinstance(data, bytes) else '\n'
+        cut = data.rfind(newline) + 1
+        pending = data[cut:]
+        if cut:
+            # held back in case it turns out to be the last line
+            if held is not None:
+                yield held, False
+            chunk = data[:cut]
+            held = chunk.decode() if isinstance(chunk, bytes) else chunk
+    if isinstance(pending, bytes):
+        pending = pending.decode()
+    if pending and held is not None:
+        yield held, False
+        held = None
+    yield (held or '') + (pending or '') + '\n', True
+
+
+# struct of arrays holding token kinds and the (start, end) offsets of
+# their text in the source, so a token costs a few bytes instead of an
+# object. firstLine is the line the source starts on, end is as for
+# LineIndex
+class TokenBuffer:
+    def __init__(self, source, firstLine=1, end=None):
+        self.source = source
+        self.lines = LineIndex(source, firstLine, end)
+        self.kinds = array('h')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def append(self, kind, start, end):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+
+# what the parser sees of a token in a TokenBuffer, text is sliced on demand
+class TokenView:
+    __slots__ = ('buffer', 'index', 'kind')
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+        self.kind = kindsByValue[buffer.kinds[index]]
+
+    @property
+    def text(self):
+        buffer = self.buffer
+        return buffer.source[buffer.starts[self.index] : buffer.ends[self.index]]
+
+    # offset of the token in the source, a string's opening quote included
+    @property
+    def start(self):
+        return self.buffer.starts[self.index] - (self.kind is TokenType.STRING)
+
+
+# finds the line and column of an offset in source. the offsets of its
+# newlines are only found the first time one is asked for, which is
+# usually never, and then each lookup is a binary search. end, when
+# given, is where the input ends in source, before the newline the lexer
+# adds; an offset there after a last newline of the input's own is put at
+# the end of the last line rather than on a line the file doesn't have
+class LineIndex:
+    def __init__(self, source, firstLine=1, end=None):
+        self.source = source
+        self.firstLine = firstLine
+        self.end = end
+        self.newlines = None
+
+    # (line, column) of offset, both counting from 1
+    def locate(self, offset):
+        if self.end and offset >= self.end and self.source[self.end - 1] == '\n':
+            offset = self.end - 1
+        if self.newlines is None:
+            self.newlines = [found.start() for found in re.finditer('\n', self.source)]
+        line = bisect_left(self.newlines, offset)
+        lineStart = self.newlines[line - 1] + 1 if line else 0
+        return self.firstLine + line, offset - lineStart + 1
+
+
+# contains the original text and token type. the lexer adds start, the
+# offset the token starts at in the source
+class Token:
+    def __init__(self, tokenText, tokenKind):
+        self.text = tokenText
+        self.kind = tokenKind
+    
+    # used to check if token is keyword or identifier
+    @staticmethod
+    def checkIfKeyword(tokenText):
+        return keywords.get(tokenText)
+
+class TokenType(enum.Enum):
+    EOF = -1
+    NEWLINE = 0
+    NUMBER = 1
+    IDENT = 2
+    STRING = 3
+    # Keywords.
+    LABEL = 101
+    GOTO = 102
+    PRINT = 103
+    INPUT = 104
+    LET = 105
+    IF = 106
+    THEN = 107
+    ENDIF = 108
+    WHILE = 109
+    REPEAT = 110
+    ENDWHILE = 111
+    # Operators.
+    EQ = 201  
+    PLUS = 202
+    MINUS = 203
+    ASTERISK = 204
+    SLASH = 205
+    EQEQ = 206
+    NOTEQ = 207
+    LT = 208
+    LTEQ = 209
+    GT = 210
+    GTEQ = 211
+
+kindsByValue = {kind.value: kind for kind in TokenType}
+
+# keyword and operator text to token type
+keywords = {kind.name: kind for kind in TokenType if kind.value >= 100 and kind.value < 200}
+operators = {
+    '\n': TokenType.NEWLINE,
+    '=': TokenType.EQ,
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.ASTERISK,
+    '/': TokenType.SLASH,
+    '==': TokenType.EQEQ,
+    '!=': TokenType.NOTEQ,
+    '<': TokenType.LT,
+    '<=': TokenType.LTEQ,
+    '>': TokenType.GT,
+    '>=': TokenType.GTEQ,
+}
+
+# the same tables as plain ints for filling a TokenBuffer
+identValue = TokenType.IDENT.value
+keywordValues = {text: kind.value for text, kind in keywords.items()}
+operatorValues = {text: kind.value for text, kind in operators.items()}
@@ -0,0 +1,287 @@
+from .nodes import *
+from .values import *
+from .fold import *
+from .infer import *
+
+# most passes a loop can make to be unrolled, and most statements all the
+# copies of its body can add up to
+UNROLL_TRIPS = 8
+UNROLL_SIZE = 64
+
+
+# Loop optimizations for WHILE, innermost loops first.
+# a loop whose counter starts at a constant, with a test and step that only
+# depend on the counter, runs a number of times known now, and if that's
+# only a few it is replaced by that many copies of its body.
+# otherwise i * k, for a counter i that goes up or down by a whole number
+# each pass and a whole number k, gets a variable of its own that goes up
+# by the step times k each pass. that's only done where type inference
+# shows i * k is a whole number a float holds exactly, and somewhere it is
+# worked out on every pass before i changes, so adding always gives what
+# multiplying would have.
+# then LETs that work out the same thing on every pass are done once before
+# the loop, behind an IF with the loop test so they still only happen if it
+# runs. loops with a LABEL or GOTO inside are left alone
+class LoopOptimizer:
+    def program(self, program):
+        self.types = TypeInference().program(program)
+        self.symbols = program.symbols
+        # the ranges are kept by id, so nodes taken out of the tree are kept
+        # here to stop new nodes reusing their ids
+        self.removed = []
+        program.statements = self.block(program.statements)
+
+    def block(self, statements):
+        result = []
+        for node in statements:
+            kind = type(node)
+            if kind is If:
+                node.body = self.block(node.body)
+            elif kind is While:
+                node.body = self.block(node.body)
+                if not jumps(node.body):
+                    self.loop(node, result)
+                    continue
+            result.append(node)
+        return result
+
+    # add what the loop becomes to result, which is the code before it
+    def loop(self, node, result):
+        copies = self.unroll(node, result)
+        if copies is not None:
+            self.removed.append(node)
+            result.extend(copies)
+            return
+
+        self.reduce(node, result)
+        hoisted = self.hoist(node)
+        if hoisted:
+            result.append(If(clone(node.comparison), hoisted + [node]))
+        else:
+            result.append(node)
+
+    # the body repeated as many times as the loop runs, None if that isn't
+    # known or is too many
+    def unroll(self, node, result):
+        names = uses(node.comparison)
+        if len(names) != 1:
+            return None
+        name = names.pop()
+        value = start(name, result)
+        steps = [statement for statement in walk(node.body)
+            if (type(statement) is Let or type(statement) is Input) and statement.name == name]
+        if value is None or len(steps) != 1 or type(steps[0]) is not Let:
+            return None
+        step = steps[0]
+        if not any(statement is step for statement in node.body) or not uses(step.expression) <= {name}:
+            return None
+
+        # run the loop on the counter alone
+        folder = ConstantFolder()
+        size = sum(1 for statement in walk(node.body))
+        trips = 0
+        while True:
+            test = folder.fold(node.comparison, {name: value})[1]
+            if test is None:
+                return None
+            if not test[0]:
+                break
+            trips += 1
+            if trips > UNROLL_TRIPS or trips * size > UNROLL_SIZE:
+                return None
+            stored = folder.fold(step.expression, {name: value})[1]
+            if stored is None:
+                return None
+            try:
+                value = convert(stored[0], stored[1], FLOAT)
+            except OverflowError:
+                return None
+        return [clone(statement) for trip in range(trips) for statement in node.body]
+
+    # strength reduction, i * k in the loop becomes a variable added to
+    def reduce(self, node, result):
+        assignments = counts(node.body)
+        for step in list(node.body):
+            if type(step) is not Let or assignments.get(step.name) != 1 or step.name not in self.types.longs:
+                continue
+            amount = increment(step)
+            if amount is None:
+                continue
+
+            # the products worked out every pass before the counter changes
+            anchors = set()
+            products(node.comparison, step.name, anchors)
+            for statement in node.body:
+                if statement is step:
+                    break
+                expressionOf(statement, lambda expression: products(expression, step.name, anchors))
+
+            for factor in sorted({factor for factor, product in anchors if self.types.integral(product)}):
+                change = amount * factor
+                if abs(change) > INT_MAX:
+                    continue
+                name = self.temporary()
+                node.comparison = self.replace(node.comparison, step.name, factor, name)
+                for statement in walk(node.body):
+                    if statement is not step:
+                        expressionOf(statement, lambda expression:
+                            self.replace(expression, step.name, factor, name), True)
+                result.append(Let(name, BinaryOp(Variable(step.name), '*', Number(str(factor)))))
+                index = next(index for index, statement in enumerate(node.body) if statement is step)
+                node.body.insert(index + 1, Let(name, BinaryOp(Variable(name),
+                    '+' if change >= 0 else '-', Number(str(abs(change))))))
+
+    # expression with every exact counter * factor in it read from name
+    def replace(self, expression, counter, factor, name):
+        # down the chain to the first part that is replaced or isn't an
+        # operation, then back up it
+        operations = []
+        while type(expression) is BinaryOp or type(expression) is Comparison:
+            if self.replaced(expression, counter, factor):
+                break
+            operations.append(expression)
+            expression = expression.left
+        if self.replaced(expression, counter, factor):
+            self.removed.append(expression)
+            expression = Variable(name)
+        elif type(expression) is UnaryOp:
+            expression.operand = self.replace(expression.operand, counter, factor, name)
+        for operation in reversed(operations):
+            operation.left = expression
+            operation.right = self.replace(operation.right, counter, factor, name)
+            expression = operation
+        return expression
+
+    # true if expression is an exact counter * factor
+    def replaced(self, expression, counter, factor):
+        return (type(expression) is BinaryOp and product(expression, counter) == factor
+            and self.types.integral(expression))
+
+    # a new variable for the program
+    def temporary(self):
+        count = 1
+        while "_s" + str(count) in self.symbols:
+            count += 1
+        self.symbols.append("_s" + str(count))
+        return "_s" + str(count)
+
+    # take the LETs that store the same value on every pass out of the
+    # loop body and return them
+    def hoist(self, node):
+        assignments = counts(node.body)
+        changed = set(assignments)
+        seen = uses(node.comparison)
+        hoisted = []
+        body = []
+        for statement in node.body:
+            if (type(statement) is Let and assignments[statement.name] == 1 and statement.name not in seen
+                    and not uses(statement.expression) & changed and not traps(statement.expression)):
+                hoisted.append(statement)
+                changed.discard(statement.name)
+            else:
+                body.append(statement)
+                for inner in walk([statement]):
+                    expressionOf(inner, lambda expression: uses(expression, seen))
+        node.body = body
+        return hoisted
+
+
+# number of LETs and INPUTs that change each variable in statements
+def counts(statements):
+    assignments = {}
+    for statement in walk(statements):
+        if type(statement) is Let or type(statement) is Input:
+            assignments[statement.name] = assignments.get(statement.name, 0) + 1
+    return assignments
+
+# the constant name holds before a loop, a C float, from a LET at the end
+# of the code before it. None if it isn't known
+def start(name, statements):
+    for statement in reversed(statements):
+        kind = type(statement)
+        if kind is Let and statement.name == name:
+            if type(statement.expression) is not Number:
+                return None
+            value = literal(statement.expression.text)
+            if value is None:
+                return None
+            try:
+                return convert(value[0], value[1], FLOAT)
+            except OverflowError:
+                return None
+        if kind is Input and statement.name == name:
+            return None
+        if kind is not Let and kind is not Input and kind is not Print and kind is not PrintString:
+            return None
+    return None
+
+# how much LET i = i + c or i - c changes i, None for any other LET
+def increment(step):
+    expression = step.expression
+    if type(expression) is not BinaryOp or expression.op not in ('+', '-'):
+        return None
+    left, right = expression.left, expression.right
+    if expression.op == '+' and type(left) is Number:
+        left, right = right, left
+    if type(left) is not Variable or left.name != step.name or type(right) is not Number:
+        return None
+    value = literal(right.text)
+    if value is None or value[1] != INT:
+        return None
+    return value[0] if expression.op == '+' else -value[0]
+
+# k if expression is counter * k or k * counter for a whole number k
+def product(expression, counter):
+    if expression.op != '*':
+        return None
+    for left, right in ((expression.left, expression.right), (expression.right, expression.left)):
+        if type(left) is Variable and left.name == counter and type(right) is Number:
+            value = literal(right.text)
+            if value is not None and value[1] == INT:
+                return value[0]
+    return None
+
+# add (k, node) to found for each counter * k in expression
+def products(expression, counter, found):
+    pending = [expression]
+    while pending:
+        expression = pending.pop()
+        kind = type(expression)
+        if kind is BinaryOp:
+            factor = product(expression, counter)
+            if factor is not None:
+                found.add((factor, expression))
+        if kind is UnaryOp:
+            pending.append(expression.operand)
+        elif kind is BinaryOp or kind is Comparison:
+            pending.append(expression.left)
+            pending.append(expression.right)
+
+# call visit with the expression or comparison statement works out, not
+# counting nested statements. with store it is set to what visit returns
+def expressionOf(statement, visit, store=False):
+    kind = type(statement)
+    if kind is Let or kind is Print:
+        value = visit(statement.expression)
+        if store:
+            statement.expression = value
+    elif kind is If or kind is While:
+        value = visit(statement.comparison)
+        if store:
+            statement.comparison = value
+
+# true if working out expression can stop the program, which is int
+# division by zero
+def traps(expression):
+    pending = [expression]
+    while pending:
+        expression = pending.pop()
+        kind = type(expression)
+        if kind is BinaryOp:
+            if expression.op == '/' and typeOf(expression) == INT:
+                return True
+            pending.append(expression.left)
+            pending.append(expression.right)
+        elif kind is UnaryOp:
+            pending.append(expression.operand)
+    return False
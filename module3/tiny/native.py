@@ -0,0 +1,73 @@
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+
+# Builds an executable straight from the generated C with --exe. the C
+# compiler is started first and reads the code from a pipe while it's
+# written, so it's starting up while the C is being generated and working
+# on the start of the code while the rest is still being written out
+
+# the C compiler to use, $CC or cc
+def cCompiler():
+    return os.environ.get("CC", "cc")
+
+# its command line, $CC can have words of its own like "ccache gcc"
+def cCommand(args, output):
+    return shlex.split(cCompiler()) + cFlags(args) + ["-x", "c", "-", "-o", output]
+
+def cFlags(args):
+    # the C is generated, warnings in it aren't anything the user can fix
+    flags = ["-O2", "-w"]
+    if args.native:
+        flags.append("-march=native")
+    return flags
+
+# a C compiler run reading C on its stdin and writing the executable output
+class NativeBuild:
+    def __init__(self, output, args):
+        self.output = output
+        # a file rather than a pipe for errors, so a compiler writing a lot
+        # of them can't block while this is blocked writing code to it
+        self.errors = tempfile.TemporaryFile('w+')
+        try:
+            self.process = subprocess.Popen(cCommand(args, output), stdin=subprocess.PIPE,
+                stdout=self.errors, stderr=self.errors, text=True)
+        except OSError as error:
+            self.errors.close()
+            sys.exit("Error: Can't run the C compiler " + cCompiler() + " (set $CC to pick one): "
+                + error.strerror)
+
+    # write the code in emitter to the compiler and wait for the executable
+    def build(self, emitter):
+        try:
+            emitter.writeTo(self.process.stdin)
+            self.process.stdin.close()
+        except BrokenPipeError:
+            # it stopped reading, what it said about why is in errors
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        emitter.close()
+        status = self.process.wait()
+        self.errors.seek(0)
+        message = self.errors.read()
+        self.errors.close()
+        if status != 0:
+            sys.exit("Error: The C compiler failed building " + self.output + " (exit status "
+                + str(status) + ")" + (":\n" + message.rstrip() if message.strip() else ""))
+
+    # stop the compiler when the C couldn't be generated
+    def cancel(self):
+        self.process.kill()
+        self.process.wait()
+        self.errors.close()
+
+# give path the permissions a new executable gets, for one copied out of
+# the cache
+def makeExecutable(path):
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(path, 0o777 & ~umask)
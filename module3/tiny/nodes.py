@@ -0,0 +1,210 @@
+# Syntax tree built by the parser and walked by the backends.
+# every node uses __slots__ since big programs make a lot of them
+
+
+# program ::= {statement}
+# symbols lists the variables in the order they were first declared
+class Program:
+    __slots__ = ('statements', 'symbols')
+
+    def __init__(self, statements, symbols):
+        self.statements = statements
+        self.symbols = symbols
+
+
+# "PRINT" string
+class PrintString:
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+# "PRINT" expression
+class Print:
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+
+# "IF" comparison "THEN" nl {statement} "ENDIF"
+class If:
+    __slots__ = ('comparison', 'body')
+
+    def __init__(self, comparison, body):
+        self.comparison = comparison
+        self.body = body
+
+
+# "WHILE" comparison "REPEAT" nl {statement} "ENDWHILE"
+class While:
+    __slots__ = ('comparison', 'body')
+
+    def __init__(self, comparison, body):
+        self.comparison = comparison
+        self.body = body
+
+
+# "LABEL" ident
+class Label:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+# "GOTO" ident
+class Goto:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+# "LET" ident "=" expression
+class Let:
+    __slots__ = ('name', 'expression')
+
+    def __init__(self, name, expression):
+        self.name = name
+        self.expression = expression
+
+
+# "INPUT" ident
+class Input:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+# left op right for one of == != < <= > >=
+# chains are grouped the way C reads them, so a == b < c is a == (b < c)
+class Comparison:
+    __slots__ = ('left', 'op', 'right')
+
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+
+# left op right for one of + - * /
+class BinaryOp:
+    __slots__ = ('left', 'op', 'right')
+
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+
+# op operand for + or -
+class UnaryOp:
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+
+# number literal, text is kept as written so the output matches the source
+class Number:
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+# variable reference
+class Variable:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+# how tightly each operator binds, the same order as in C
+precedence = {
+    '==': 1, '!=': 1,
+    '<': 2, '<=': 2, '>': 2, '>=': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+}
+
+
+# every statement in statements, including the ones nested in IF and WHILE
+def walk(statements):
+    for statement in statements:
+        yield statement
+        if type(statement) is If or type(statement) is While:
+            yield from walk(statement.body)
+
+
+# true if any statement in statements is a LABEL, so code can jump in
+def hasLabel(statements):
+    return any(type(statement) is Label for statement in walk(statements))
+
+
+# true if code can jump into or out of statements
+def jumps(statements):
+    return any(type(statement) is Label or type(statement) is Goto for statement in walk(statements))
+
+
+# names of the variables LET or INPUT can change in statements
+def assigned(statements):
+    return {statement.name for statement in walk(statements)
+        if type(statement) is Let or type(statement) is Input}
+
+
+# names of the variables an expression or comparison reads
+def uses(node, names=None):
+    if names is None:
+        names = set()
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        kind = type(node)
+        if kind is Variable:
+            names.add(node.name)
+        elif kind is UnaryOp:
+            pending.append(node.operand)
+        elif kind is BinaryOp or kind is Comparison:
+            pending.append(node.left)
+            pending.append(node.right)
+    return names
+
+
+# the operand at the bottom of a chain like a + b - c, and the operations
+# going back up it, innermost first. the parser builds chains leaning
+# left, so walkers go up one with this instead of recursing down .left,
+# which runs out of stack on an expression with a few thousand terms
+def chain(node):
+    operations = []
+    while type(node) is BinaryOp or type(node) is Comparison:
+        operations.append(node)
+        node = node.left
+    operations.reverse()
+    return node, operations
+
+
+# a copy of a statement or expression sharing no nodes with it
+def clone(node):
+    kind = type(node)
+    if kind is BinaryOp or kind is Comparison:
+        bottom, operations = chain(node)
+        node = clone(bottom)
+        for operation in operations:
+            node = type(operation)(node, operation.op, clone(operation.right))
+        return node
+    if kind is UnaryOp:
+        return UnaryOp(node.op, clone(node.operand))
+    if kind is Let:
+        return Let(node.name, clone(node.expression))
+    if kind is Print:
+        return Print(clone(node.expression))
+    if kind is If or kind is While:
+        return kind(clone(node.comparison), [clone(statement) for statement in node.body])
+    # the rest only hold strings
+    return kind(*[getattr(node, field) for field in kind.__slots__])
@@ -0,0 +1,29 @@
+from .jumps import *
+from .fold import *
+from .dce import *
+from .peephole import *
+from .loops import *
+from .cse import *
+
+# passes run on the syntax tree with -O, in order. GOTOs are threaded and
+# goto loops made into WHILEs first. the peephole pass goes next to drop
+# the labels nothing jumps to then, which folding would otherwise
+# stop at, and last to clean up what the others leave. shared expressions
+# go into variables before the loop pass so it can hoist the ones that
+# don't change, and folding runs again after it to work out what unrolling
+# makes constant
+passes = [
+    JumpThreader,
+    Peephole,
+    ConstantFolder,
+    SubexpressionEliminator,
+    LoopOptimizer,
+    ConstantFolder,
+    DeadCodeEliminator,
+    Peephole,
+]
+
+def optimize(program):
+    for optimizationPass in passes:
+        optimizationPass().program(program)
+    return program
@@ -0,0 +1,354 @@
+import sys
+from .lex import *
+from .colors import *
+from .nodes import *
+
+# raised once an error is recorded, to give up on the statement it's in
+class ParseError(Exception):
+    pass
+
+
+# Keeps track of current token, checks if code has correct syntax and
+# builds the syntax tree for the backends.
+# errors are collected in diagnostics rather than stopping at the first.
+# after one, the parser skips ahead to the end of the line or block and
+# carries on, and program() reports them all at the end. errorLimit stops
+# it early, 0 means no limit
+class Parser:
+    def __init__(self, lexer, errorLimit=20):
+        self.lexer = lexer
+        self.diagnostics = []
+        self.errorLimit = errorLimit
+
+        # keeps track of variables, labels, gotos declared
+        # symbolOrder keeps variables in the order they were declared
+        self.symbols = set()
+        self.symbolOrder = []
+        self.labelsDeclared = set()
+        self.labelsGotoed = {}
+
+        # init tokens, lexing errors in them are reported with the rest
+        self.peekToken = self.fetchToken()
+        self.skipToken()
+
+    # return true if cur token matches
+    def checkToken(self, kind):
+        return kind == self.curToken.kind
+
+    # return true if next token matches
+    def checkPeek(self, kind):
+        return kind == self.peekToken.kind
+
+    # find match for cur token and advance, if not error
+    def match(self, kind):
+        if not self.checkToken(kind):
+            self.abort("Expected " + kind.name + ", got " + self.curToken.kind.name)
+        self.nextToken()
+
+    # move to next token
+    def nextToken(self):
+        self.curToken = self.peekToken
+        try:
+            self.peekToken = self.lexer.getToken()
+        except LexError as error:
+            # give up on the statement, the rest of the bad line is skipped
+            self.report(str(error))
+            self.peekToken = self.lexer.getToken()
+            raise ParseError
+
+    # the next token from the lexer, only reporting a lexing error. the
+    # lexer carries on from the newline ending the bad line
+    def fetchToken(self):
+        try:
+            return self.lexer.getToken()
+        except LexError as error:
+            self.report(str(error))
+            return self.lexer.getToken()
+
+    # a syntax error at the current token, the statement it's in is skipped
+    def abort(self, message):
+        self.error(message)
+        raise ParseError
+
+    # an error that doesn't stop the statement being parsed, at token or
+    # the current one
+    def error(self, message, token=None):
+        line, column = self.lexer.location(token or self.curToken)
+        self.report(colors.FAIL + "Error on line " + str(line) + ", column " + str(column) + ": "
+            + colors.ENDC + message)
+
+    # record a diagnostic, stopping once there are errorLimit of them
+    def report(self, diagnostic):
+        self.diagnostics.append(diagnostic)
+        if len(self.diagnostics) == self.errorLimit:
+            self.diagnostics.append("Too many errors, stopping.")
+            self.exit()
+
+    # print every diagnostic and exit
+    def exit(self):
+        sys.exit("\n".join(self.diagnostics))
+
+    # statements up to the end token, skipping any that have errors
+    def statements(self, end):
+        statements = []
+        while not self.checkToken(end):
+            # a missing ENDIF or ENDWHILE is most likely from an earlier error
+            if self.checkToken(TokenType.EOF) and self.diagnostics:
+                raise ParseError
+            try:
+                statements.append(self.statement())
+            except ParseError:
+                self.synchronize(end)
+                if self.checkToken(TokenType.EOF) and end != TokenType.EOF:
+                    raise
+        return statements
+
+    # after an error skip to the start of the next statement, or to the
+    # end token of the block the error was in. a stray ENDIF or ENDWHILE is
+    # skipped like any other token
+    def synchronize(self, end):
+        while not (self.checkToken(TokenType.NEWLINE) or self.checkToken(TokenType.EOF)
+                or self.checkToken(end)):
+            self.skipToken()
+        while self.checkToken(TokenType.NEWLINE):
+            self.skipToken()
+
+    # nextToken while recovering, lexing errors are only reported. the
+    # tokens left on the bad line are dropped along with it, so no statement
+    # is parsed from them to give a second error for the line
+    def skipToken(self):
+        self.curToken = self.peekToken
+        while True:
+            try:
+                self.peekToken = self.lexer.getToken()
+                return
+            except LexError as error:
+                self.report(str(error))
+                self.curToken = self.lexer.getToken()
+
+    # Production rules
+
+    # program ::= {statement}
+    def program(self):
+        # skip newlines 
+        while self.checkToken(TokenType.NEWLINE):
+            self.skipToken()
+        
+        #  parse all statements in program
+        statements = self.statements(TokenType.EOF)
+
+        # check each goto label is declared
+        for label in self.labelsGotoed:
+            if label not in self.labelsDeclared:
+                self.error("Attempting to GOTO to undeclared label: " + label, self.labelsGotoed[label])
+
+        if self.diagnostics:
+            self.exit()
+        return Program(statements, self.symbolOrder)
+
+    # all possible statements
+    def statement(self):
+        # check first token to see statement type
+
+        # "PRINT" (expression | string)
+        if self.checkToken(TokenType.PRINT):
+            self.nextToken()
+
+            if self.checkToken(TokenType.STRING):
+                # just a string
+                node = PrintString(self.curToken.text)
+                self.nextToken()
+            else:
+                # expression
+                node = Print(self.expression())
+        
+        # "IF" comparison "THEN" nl {statement} "ENDIF" nl        
+        elif self.checkToken(TokenType.IF):
+
+            self.nextToken()
+            comparison = self.header(TokenType.THEN)
+
+            # get statements in if
+            body = self.statements(TokenType.ENDIF)
+            self.match(TokenType.ENDIF)
+            node = If(comparison, body)
+
+        # "WHILE" comparison  "REPEAT" {statement} "ENDWHILE"
+        elif self.checkToken(TokenType.WHILE):
+
+            self.nextToken()
+            comparison = self.header(TokenType.REPEAT)
+
+            # get statements in while
+            body = self.statements(TokenType.ENDWHILE)
+            self.match(TokenType.ENDWHILE)
+            node = While(comparison, body)
+
+        # "LABEL" ident
+        elif self.checkToken(TokenType.LABEL):
+
+            self.nextToken()
+
+            # make sure label doesn't exist
+            if self.curToken.text in self.labelsDeclared:
+                self.error("Label already exists: " + self.curToken.text)
+            self.labelsDeclared.add(self.curToken.text)
+
+            node = Label(self.curToken.text)
+            self.match(TokenType.IDENT)
+
+        # "GOTO" ident
+        elif self.checkToken(TokenType.GOTO):
+            
+            self.nextToken()
+
+            # keep track of goto labels, and the first goto to each
+            self.labelsGotoed.setdefault(self.curToken.text, self.curToken)
+            node = Goto(self.curToken.text)
+            self.match(TokenType.IDENT)
+        
+        # "LET" ident "=" expression
+        elif self.checkToken(TokenType.LET):
+            self.nextToken()
+
+            # add var to table
+            name = self.curToken.text
+            self.declare(name)
+
+            self.match(TokenType.IDENT)
+            self.match(TokenType.EQ)
+            node = Let(name, self.expression())
+
+        # "INPUT" ident
+        elif self.checkToken(TokenType.INPUT):
+            self.nextToken()
+
+            # add to symbol set
+            self.declare(self.curToken.text)
+
+            node = Input(self.curToken.text)
+            self.match(TokenType.IDENT)
+
+        # unknown statement
+        else:
+            self.abort("Invalid statement at " + self.curToken.text + " (" + self.curToken.kind.name + ")")
+
+        # newline
+        self.nl()
+        return node
+
+    # comparison keyword nl, the rest of an IF or WHILE line. the body is
+    # still parsed after an error here, so its own errors are found and
+    # its ENDIF or ENDWHILE isn't taken for a stray one
+    def header(self, keyword):
+        try:
+            comparison = self.comparison()
+            self.match(keyword)
+            self.nl()
+        except ParseError:
+            comparison = None
+            while not (self.checkToken(TokenType.NEWLINE) or self.checkToken(TokenType.EOF)):
+                self.skipToken()
+            while self.checkToken(TokenType.NEWLINE):
+                self.skipToken()
+        return comparison
+
+    # add var to the symbol table the first time it is assigned
+    def declare(self, name):
+        if name not in self.symbols:
+            self.symbols.add(name)
+            self.symbolOrder.append(name)
+
+    # nl :: = '\n' +
+    def nl(self):
+        # at least 1 newline
+        self.match(TokenType.NEWLINE)
+        # loop makes sure no extra
+        while self.checkToken(TokenType.NEWLINE):
+            self.nextToken()
+
+    # comparison ::= expression (("==" | "!=" | ">" | ">=" | "<" | "<=") expression)+
+    def comparison(self):
+        operands = [self.expression()]
+        ops = []
+        # check that there is a comparison operator
+        if self.isComparisonOperator():
+            ops.append(self.curToken.text)
+            self.nextToken()
+            operands.append(self.expression())
+        else:
+            self.abort("Expected comparison operator got: " + self.curToken.text)
+
+        # keep going through expressions
+        while self.isComparisonOperator():
+            ops.append(self.curToken.text)
+            self.nextToken()
+            operands.append(self.expression())
+
+        # group the chain like C does, < <= > >= bind tighter than == !=
+        # so the chain is split into relational runs joined by equality ops
+        runs = [operands[0]]
+        joins = []
+        for op, operand in zip(ops, operands[1:]):
+            if op == '==' or op == '!=':
+                joins.append(op)
+                runs.append(operand)
+            else:
+                runs[-1] = Comparison(runs[-1], op, operand)
+        node = runs[0]
+        for op, run in zip(joins, runs[1:]):
+            node = Comparison(node, op, run)
+        return node
+    
+    # expression ::= term {( "-" | "+" ) term}
+    def expression(self):
+        node = self.term()
+        # keep getting terms
+        while self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
+            op = self.curToken.text
+            self.nextToken()
+            node = BinaryOp(node, op, self.term())
+        return node
+
+    # term ::= unary {( "/" | "*" ) unary}
+    def term(self):
+        node = self.unary()
+        # keep getting unary
+        while self.checkToken(TokenType.ASTERISK) or self.checkToken(TokenType.SLASH):
+            op = self.curToken.text
+            self.nextToken()
+            node = BinaryOp(node, op, self.unary())
+        return node
+
+    # unary ::= ["+" | "-"] primary
+    def unary(self):
+        # optional
+        if self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
+            op = self.curToken.text
+            self.nextToken()
+            return UnaryOp(op, self.primary())
+        return self.primary()
+        
+
+    # primary ::= number | ident
+    def primary(self):
+        if self.checkToken(TokenType.NUMBER):
+            node = Number(self.curToken.text)
+            self.nextToken()
+            return node
+        elif self.checkToken(TokenType.IDENT):
+            # make sure var exists
+            if self.curToken.text not in self.symbols:
+                self.error("Reference variable before assignment: " + self.curToken.text)
+            node = Variable(self.curToken.text)
+            self.nextToken()
+            return node
+        else:
+            # Error
+            self.abort("Unexpected token at " + self.curToken.text)
+
+
+    def isComparisonOperator(self):
+        return self.checkToken(TokenType.GT) or self.checkToken(TokenType.GTEQ) \
+        or self.checkToken(TokenType.LT) or self.checkToken(TokenType.LTEQ) \
+        or self.checkToken(TokenType.EQEQ) or self.checkToken(TokenType.NOTEQ)
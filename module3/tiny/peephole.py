@@ -0,0 +1,119 @@
+from .nodes import *
+from .values import *
+
+# Small cleanups that make the C shorter without changing what it does.
+# drops GOTOs to a LABEL straight after them, LABELs no GOTO goes to,
+# unary +, double negation, and turns a - -b into a + b, a + -1.5 into
+# a - 1.5 and -a * -b into a * b. these are exact for floats and doubles;
+# int math is left alone since negating can overflow there. they can
+# change the sign of a nan, which prints as nan or -nan: x86 passes a nan
+# operand's sign on, and a - -b keeps the sign -b has while a + b keeps
+# b's. C doesn't say what sign a nan result has and gcc makes the same
+# rewrites itself, so -O only keeps values, not the signs of nans
+class Peephole:
+    def program(self, program):
+        program.statements = self.jumps(program.statements)
+        self.targets = {node.name for node in walk(program.statements) if type(node) is Goto}
+        program.statements = self.block(program.statements)
+
+    # statements without the GOTOs that only skip LABELs
+    def jumps(self, statements):
+        result = []
+        for index, node in enumerate(statements):
+            kind = type(node)
+            if kind is Goto:
+                following = index + 1
+                while (following < len(statements) and type(statements[following]) is Label
+                        and statements[following].name != node.name):
+                    following += 1
+                if following < len(statements) and type(statements[following]) is Label:
+                    continue
+            elif kind is If or kind is While:
+                node.body = self.jumps(node.body)
+            result.append(node)
+        return result
+
+    def block(self, statements):
+        result = []
+        for node in statements:
+            kind = type(node)
+            if kind is Label and node.name not in self.targets:
+                continue
+            if kind is Let or kind is Print:
+                node.expression = self.simplify(node.expression)
+            elif kind is If or kind is While:
+                node.comparison = self.simplify(node.comparison)
+                node.body = self.block(node.body)
+            result.append(node)
+        return result
+
+    # return node with its cleanups done
+    def simplify(self, node):
+        kind = type(node)
+        if kind is UnaryOp:
+            operand = self.simplify(node.operand)
+            if node.op == '+':
+                return operand
+            if type(operand) is UnaryOp:
+                # - -x, the inner one is '-' since + was just dropped
+                return operand.operand
+            if type(operand) is Number:
+                negated = negate(operand)
+                if negated is not None:
+                    return negated
+            if operand is node.operand:
+                return node
+            return UnaryOp(node.op, operand)
+
+        if kind is not BinaryOp and kind is not Comparison:
+            return node
+
+        # a step at a time up the chain
+        bottom, operations = chain(node)
+        node = self.simplify(bottom)
+        ctype = typeOf(node)
+        for operation in operations:
+            operation.left = node
+            operation.right = self.simplify(operation.right)
+            if type(operation) is Comparison:
+                ctype = INT
+                node = operation
+            else:
+                ctype = max(ctype, typeOf(operation.right))
+                node = operation if ctype == INT else self.signs(operation)
+        return node
+
+    # a float or double operation with its signs cleaned up
+    def signs(self, node):
+        if node.op == '+' or node.op == '-':
+            # adding a negative is subtracting, and the other way round
+            right = positive(node.right)
+            if right is not None:
+                return BinaryOp(node.left, '-' if node.op == '+' else '+', right)
+        else:
+            # the signs cancel
+            left = positive(node.left)
+            right = positive(node.right)
+            if left is not None and right is not None:
+                return BinaryOp(left, node.op, right)
+        return node
+
+
+# node without its minus sign, if it is a negation or a negative number.
+# not for int math, where -0 is 0 and a - -0 would become a + 0, which
+# differs for a = -0.0
+def positive(node):
+    if type(node) is UnaryOp and node.op == '-' and typeOf(node.operand) != INT:
+        return node.operand
+    if type(node) is Number and node.text[0] == '-' and literal(node.text) != (0, INT):
+        return negate(node)
+    return None
+
+# the number with its sign flipped, None if that changes its C type
+def negate(node):
+    text = node.text[1:] if node.text[0] == '-' else '-' + node.text
+    before = literal(node.text)
+    after = literal(text)
+    if before is None or after is None or before[1] != after[1]:
+        return None
+    return Number(text)
@@ -0,0 +1,190 @@
+import ast
+import sys
+from array import array
+from .nodes import *
+from .runtime import *
+from .values import *
+from .cfg import *
+
+# python operators for each Teeny Tiny one
+binaryOperators = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult, '/': ast.Div}
+compareOperators = {
+    '==': ast.Eq, '!=': ast.NotEq,
+    '<': ast.Lt, '<=': ast.LtE, '>': ast.Gt, '>=': ast.GtE,
+}
+
+# most operations of a chain in one nested python expression, a longer
+# chain is cut into pieces held in locals so python's compiler doesn't run
+# out of stack on it
+PIECE = 64
+
+# what the generated function is passed, as locals they are quick to get at
+parameters = ['values', 'read', 'write', 'toFloat', 'divide', 'intDivide', 'formatNumber']
+
+
+# Turns a syntax tree into a python ast.Module defining run(), with the same
+# C conversions and float rounding the closure engine does. variables are
+# slots in a float array. IF and WHILE become python if and while, except
+# where GOTO can jump in or out of them: then the code is run as blocks of
+# the control flow graph by a loop that picks the next block by number,
+# like the closure engine does
+class PythonGenerator:
+    def program(self, program):
+        self.slots = {name: slot for slot, name in enumerate(program.symbols)}
+        self.pieces = 0
+        if hasLabel(program.statements):
+            body = self.dispatch(program.statements)
+        else:
+            body = self.block(program.statements)
+
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(name) for name in parameters],
+            kwonlyargs=[], kw_defaults=[], defaults=[])
+        function = ast.FunctionDef('run', arguments, body or [ast.Pass()], [], None)
+        return ast.fix_missing_locations(ast.Module([function], []))
+
+    # python statements for statements that no GOTO jumps into or out of
+    def block(self, statements):
+        code = []
+        for node in statements:
+            code.append(self.statement(node))
+        return code
+
+    def statement(self, node):
+        kind = type(node)
+        if kind is Let:
+            return ast.Assign([self.slot(node.name, ast.Store())], self.expression(node.expression, False))
+        if kind is Input:
+            value = ast.Call(name('read'), [self.slot(node.name)], [])
+            return ast.Assign([self.slot(node.name, ast.Store())], value)
+        if kind is Print:
+            text = ast.Call(name('formatNumber'), [self.expression(node.expression, False)], [])
+            return ast.Expr(ast.Call(name('write'), [text], []))
+        if kind is PrintString:
+            return ast.Expr(ast.Call(name('write'), [ast.Constant(node.text + '\n')], []))
+        if kind is If:
+            return ast.If(self.expression(node.comparison), self.block(node.body) or [ast.Pass()], [])
+        return ast.While(self.expression(node.comparison), self.block(node.body) or [ast.Pass()], [])
+
+    # blocks of the control flow graph, with IF and WHILE kept whole where
+    # they can be, run from a while loop that finds the current one by
+    # binary search on its number
+    def dispatch(self, statements):
+        self.blocks = [self.block(block.statements) + [self.exit(block)]
+            for block in controlFlow(statements, nested=True)]
+        start = ast.Assign([name('block', ast.Store())], ast.Constant(0))
+        return [start, ast.While(ast.Constant(True), self.search(0, len(self.blocks)), [])]
+
+    # code that sets the next block, or returns at the end of the program
+    def exit(self, block):
+        if block.test is not None:
+            return ast.Assign([name('block', ast.Store())], ast.IfExp(self.expression(block.test),
+                ast.Constant(block.target), ast.Constant(block.otherwise)))
+        if block.target is None:
+            return ast.Return(None)
+        return ast.Assign([name('block', ast.Store())], ast.Constant(block.target))
+
+    # if tree that runs block number "block" of those from low up to high
+    def search(self, low, high):
+        if high - low == 1:
+            return self.blocks[low]
+        middle = (low + high) // 2
+        test = ast.Compare(name('block'), [ast.Lt()], [ast.Constant(middle)])
+        return [ast.If(test, self.search(low, middle), self.search(middle, high))]
+
+    def slot(self, variable, context=None):
+        return ast.Subscript(name('values'), ast.Constant(self.slots[variable]), context or ast.Load())
+
+    # python expression for an expression or comparison. float math is done
+    # in double and rounded back to float, which gives the same result C
+    # gets for one operation. rounded=False leaves off the last rounding
+    # when the caller stores or prints the value, which rounds it anyway
+    def expression(self, node, rounded=True):
+        kind = type(node)
+        if kind is Variable:
+            return self.slot(node.name)
+        if kind is Number:
+            return ast.Constant(self.constant(node))
+        if kind is UnaryOp:
+            operand = self.expression(node.operand, rounded)
+            if node.op == '-':
+                return ast.UnaryOp(ast.USub(), operand)
+            return operand
+
+        # a step at a time up the chain. a long one becomes a tuple of
+        # (_p1 := piece, _p1 := piece using _p1, ...)[-1]
+        bottom, operations = chain(node)
+        code = self.expression(bottom)
+        leftType = typeOf(bottom)
+        pieces = []
+        for index, operation in enumerate(operations):
+            if index and index % PIECE == 0:
+                if not pieces:
+                    self.pieces += 1
+                    piece = '_p' + str(self.pieces)
+                pieces.append(ast.NamedExpr(name(piece, ast.Store()), code))
+                code = name(piece)
+            last = index == len(operations) - 1
+            code, leftType = self.operation(operation, code, leftType, rounded or not last)
+        if pieces:
+            code = ast.Subscript(ast.Tuple(pieces + [code], ast.Load()), ast.Constant(-1), ast.Load())
+        return code
+
+    # python expression for node given the one for its left side, which is
+    # of leftType, and the type of what it works out
+    def operation(self, node, left, leftType, rounded):
+        # C converts both sides to the wider type first
+        resultType = max(leftType, typeOf(node.right))
+        if leftType == INT and resultType == FLOAT:
+            if type(node.left) is Number:
+                left = ast.Constant(toFloat(self.constant(node.left)))
+            else:
+                left = ast.Call(name('toFloat'), [left], [])
+        right = self.operand(node.right, resultType)
+        if type(node) is Comparison:
+            return ast.Compare(left, [compareOperators[node.op]()], [right]), INT
+        if node.op != '/':
+            code = ast.BinOp(left, binaryOperators[node.op](), right)
+        elif resultType == INT:
+            code = ast.Call(name('intDivide'), [left, right], [])
+        elif type(node.right) is Number and self.constant(node.right) != 0:
+            code = ast.BinOp(left, ast.Div(), right)
+        else:
+            code = ast.Call(name('divide'), [left, right], [])
+
+        if resultType == FLOAT and rounded:
+            return ast.Call(name('toFloat'), [code], []), resultType
+        return code, resultType
+
+    # python expression for an operand of an operation done in type
+    def operand(self, node, type):
+        if typeOf(node) == INT and type == FLOAT:
+            if isinstance(node, Number):
+                return ast.Constant(toFloat(self.constant(node)))
+            return ast.Call(name('toFloat'), [self.expression(node)], [])
+        return self.expression(node)
+
+    # python value of a number literal, ints too big for C's int stay ints
+    def constant(self, node):
+        value = literal(node.text)
+        return int(node.text) if value is None else value[0]
+
+
+# Runs a program in-process as python bytecode compiled from the ast that
+# PythonGenerator makes
+class PythonEngine:
+    def __init__(self, program, input=sys.stdin, output=sys.stdout):
+        self.reader = InputReader(input)
+        self.write = output.write
+        self.size = len(program.symbols)
+        module = PythonGenerator().program(program)
+        namespace = {}
+        exec(compile(module, '<teenytiny>', 'exec'), namespace)
+        self.function = namespace['run']
+
+    def run(self):
+        values = array('f', bytes(4 * self.size))
+        self.function(values, self.reader.input, self.write, toFloat, divide, intDivide, formatNumber)
+
+
+def name(id, context=None):
+    return ast.Name(id, context or ast.Load())
@@ -0,0 +1,183 @@
+import math
+import re
+import sys
+from array import array
+
+# Runtime support for the engines that run programs in-process, behaving
+# like the generated C would: PRINT goes through (float) and "%.2f", and
+# INPUT is scanf("%f") that sets the variable to 0 and skips a word when
+# the input isn't a number, and leaves it alone at end of input
+
+
+# C's isspace
+whitespace = ' \t\n\v\f\r'
+
+# a plain decimal number followed by whitespace, by far the usual input
+simpleNumber = re.compile(r'[ \t\n\v\f\r]*([+-]?[0-9]+(?:\.[0-9]*)?(?:[eE][+-]?[0-9]+)?)(?=[ \t\n\v\f\r])')
+
+
+# Reads numbers the way scanf("%f") does, a line of input at a time
+class InputReader:
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = ''
+        self.pos = 0
+
+    # INPUT, returns the variable's new value given its current one
+    def input(self, current):
+        found = simpleNumber.match(self.buffer, self.pos)
+        if found is not None:
+            self.pos = found.end()
+            return float(found.group(1))
+
+        value = self.scanFloat()
+        if value is None:
+            return current
+        if value is False:
+            self.skipWord()
+            return 0.0
+        return value
+
+    # return the next char without using it, '' at end of input
+    def peek(self):
+        if self.pos == len(self.buffer):
+            line = self.stream.readline()
+            if line:
+                self.buffer = line
+                self.pos = 0
+        return self.buffer[self.pos : self.pos + 1]
+
+    def nextChar(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    # scanf("%f"), None at end of input, False if the input isn't a number.
+    # like glibc the chars read before finding that out are gone
+    def scanFloat(self):
+        while self.peek() and self.peek() in whitespace:
+            self.pos += 1
+        if not self.peek():
+            return None
+
+        sign = ''
+        if self.peek() in ('+', '-'):
+            sign = self.nextChar()
+
+        first = self.peek().lower()
+        if first == 'i':
+            if not self.expect('inf'):
+                return False
+            if self.peek().lower() == 'i' and not self.expect('inity'):
+                return False
+            return float(sign + 'inf')
+        if first == 'n':
+            if not self.expect('nan'):
+                return False
+            return float(sign + 'nan')
+
+        text = sign
+        if first == '0':
+            text += self.nextChar()
+            if self.peek().lower() == 'x':
+                self.pos += 1
+                return self.scanHex(sign)
+
+        text += self.scanDigits('0123456789')
+        if self.peek() == '.':
+            self.pos += 1
+            text += '.' + self.scanDigits('0123456789')
+        if not any(char.isdigit() for char in text):
+            return False
+
+        # an exponent with no digits is left off, like glibc does
+        if self.peek() in ('e', 'E'):
+            self.pos += 1
+            exponent = self.nextChar() if self.peek() in ('+', '-') else ''
+            exponentDigits = self.scanDigits('0123456789')
+            if exponentDigits:
+                text += 'e' + exponent + exponentDigits
+        return toFloat(float(text))
+
+    # hex float after the "0x", needs a digit or a '.' to be a number
+    def scanHex(self, sign):
+        if not self.peek() or self.peek().lower() not in '0123456789abcdef.':
+            return False
+        text = sign + '0x' + self.scanDigits('0123456789abcdefABCDEF')
+        if self.peek() == '.':
+            self.pos += 1
+            text += '.' + self.scanDigits('0123456789abcdefABCDEF')
+        # "0x." is 0, and glibc doesn't look for an exponent then
+        if text.endswith('x.'):
+            text += '0'
+        elif self.peek() in ('p', 'P'):
+            self.pos += 1
+            exponent = self.nextChar() if self.peek() in ('+', '-') else ''
+            exponentDigits = self.scanDigits('0123456789')
+            if exponentDigits:
+                text += 'p' + exponent + exponentDigits
+        try:
+            return toFloat(float.fromhex(text))
+        except OverflowError:
+            return float(sign + 'inf')
+
+    def scanDigits(self, digits):
+        start = self.pos
+        while self.peek() and self.peek() in digits:
+            self.pos += 1
+        return self.buffer[start : self.pos]
+
+    # read word, true if all of it (any case) is there. like glibc the
+    # char that doesn't match is read too
+    def expect(self, word):
+        for char in word:
+            found = self.peek().lower()
+            if not found:
+                return False
+            self.pos += 1
+            if found != char:
+                return False
+        return True
+
+    # scanf("%*s"), skip whitespace then a word
+    def skipWord(self):
+        while self.peek() and self.peek() in whitespace:
+            self.pos += 1
+        while self.peek() and self.peek() not in whitespace:
+            self.pos += 1
+
+
+# one float to round values through the way storing to a C float would
+scratch = array('f', [0.0])
+
+def toFloat(value):
+    scratch[0] = value
+    return scratch[0]
+
+
+# PRINT expression, printf("%.2f\n", (float)(value))
+def formatNumber(value):
+    scratch[0] = value
+    value = scratch[0]
+    if value != value and math.copysign(1, value) < 0:
+        return '-nan\n'
+    return '%.2f\n' % value
+
+
+# float division, x86 gives inf for x / 0 and a negative nan for 0 / 0
+def divide(left, right):
+    if right:
+        return left / right
+    if left != left:
+        return left
+    if left == 0:
+        return -math.nan
+    return math.copysign(math.inf, left) * math.copysign(1, right)
+
+
+# int division rounds toward zero, dividing by zero kills the program
+def intDivide(left, right):
+    if right == 0:
+        sys.exit("Runtime error. Integer division by zero.")
+    value = abs(left) // abs(right)
+    return -value if (left < 0) != (right < 0) else value
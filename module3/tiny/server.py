@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+
+# Compile server.
+# keeps the compiler loaded in one long running process that listens on
+# a Unix socket, so a compile doesn't pay for starting python and
+# importing the compiler. each request is forked off from the warm server,
+# which gives it its own working directory and output and lets requests
+# run at the same time.
+#
+# a request is one line of json, {"argv": [...], "cwd": "...", "env": {...}},
+# and the reply is {"status": exit status, "stdout": "...", "stderr": "..."}
+
+# where the server listens unless told otherwise
+def defaultSocket():
+    return os.environ.get("TEENYTINY_SOCKET",
+        os.path.join("/tmp", "teenytiny-" + str(os.getuid()) + ".sock"))
+
+
+class CompileServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # handler is called with a request's argv in the request's directory,
+    # it is the command line entry point
+    def __init__(self, path, handler):
+        self.handler = handler
+        removeStaleSocket(path)
+        oldMask = os.umask(0o077)
+        try:
+            super().__init__(path, CompileRequest)
+        finally:
+            os.umask(oldMask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+class CompileRequest(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        os.chdir(request["cwd"])
+        # the client's TEENYTINY_ settings and $CC, not the server's
+        for name in [name for name in os.environ if clientSetting(name)]:
+            del os.environ[name]
+        os.environ.update(request.get("env", {}))
+        status, stdout, stderr = runCaptured(self.server.handler, request["argv"])
+        reply = {"status": status, "stdout": stdout, "stderr": stderr}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+# whether the environment variable name comes from the client
+def clientSetting(name):
+    return name.startswith("TEENYTINY_") or name == "CC"
+
+
+# run handler(argv) like the command line would, returning its exit status
+# and what it printed
+def runCaptured(handler, argv):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    sys.argv = ["teenytiny"] + argv
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        handler()
+        status = 0
+    except SystemExit as exit:
+        # sys.exit("message") prints it and exits with 1
+        if exit.code is None or isinstance(exit.code, int):
+            status = exit.code or 0
+        else:
+            print(exit.code, file=stderr)
+            status = 1
+    except Exception:
+        traceback.print_exc(file=stderr)
+        status = 1
+    finally:
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+# remove a socket left behind by a server that is gone, but refuse to
+# take over from one that is still running
+def removeStaleSocket(path):
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    sys.exit("Error: A compile server is already listening on " + path)
@@ -0,0 +1,96 @@
+import json
+import time
+import tracemalloc
+from .lex import *
+from .nodes import *
+
+# Wall time and peak memory for each phase of a compile, and counts of
+# what it went through, for --time-passes and --stats-json. memory is
+# traced with tracemalloc, which makes everything slower, so the times
+# are for comparing phases with each other rather than with plain compiles
+class CompileStats:
+    def __init__(self):
+        self.phases = []
+        self.counters = {}
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        self.start = time.perf_counter()
+
+    # with stats.phase(name): times the block as one phase
+    def phase(self, name):
+        return Phase(self, name)
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    # make the lexer with makeLexer(input) and lex all of the source before
+    # parsing starts, so lexing, setting up the lexer included, is a phase
+    # of its own, and give the parser the tokens
+    def tokens(self, makeLexer, input):
+        with self.phase("lex"):
+            lexer = makeLexer(input)
+            tokens = []
+            while True:
+                try:
+                    token = lexer.getToken()
+                except LexError as error:
+                    # the parser gets it where it came up
+                    tokens.append(error)
+                    continue
+                tokens.append(token)
+                if token.kind == TokenType.EOF:
+                    break
+        self.count("tokens", sum(1 for token in tokens if type(token) is not LexError) - 1)
+        return ReplayLexer(tokens, lexer)
+
+    def parsed(self, parser, program):
+        self.count("statements", sum(1 for _ in walk(program.statements)))
+        self.count("symbols", len(program.symbols))
+        self.count("labels", len(parser.labelsDeclared))
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.start
+        if self.tracing:
+            tracemalloc.stop()
+
+    # what --stats-json writes
+    def save(self, path):
+        with open(path, 'w') as outputFile:
+            json.dump({
+                "seconds": self.seconds,
+                "phases": self.phases,
+                "counters": self.counters,
+            }, outputFile, indent=2)
+            outputFile.write("\n")
+
+    # the table --time-passes prints
+    def report(self, outputFile):
+        print("%-10s %10s %7s %12s" % ("phase", "seconds", "%", "peak KiB"), file=outputFile)
+        for phase in self.phases:
+            print("%-10s %10.4f %6.1f%% %12.1f" % (phase["name"], phase["seconds"],
+                100 * phase["seconds"] / self.seconds, phase["peak"] / 1024), file=outputFile)
+        print("%-10s %10.4f" % ("total", self.seconds), file=outputFile)
+        for name, value in self.counters.items():
+            print("%-10s %10d" % (name, value), file=outputFile)
+
+
+# one phase being timed, started and stopped by a with block
+class Phase:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        seconds = time.perf_counter() - self.start
+        self.stats.phases.append({
+            "name": self.name,
+            "seconds": seconds,
+            "peak": tracemalloc.get_traced_memory()[1],
+        })
+        return False
@@ -0,0 +1,145 @@
+import math
+import struct
+from .nodes import *
+
+# Number semantics of the generated C, for anything that works values out
+# at compile time. literals without a '.' are int, other literals double,
+# variables float, and a literal ending in 'f' is a float constant.
+# types are ordered so the wider of two is the result of mixing them.
+# nothing that would give inf or nan is worked out here, so a nan's sign
+# is only ever up to the C compiler and the peephole rewrites
+INT = 0
+FLOAT = 1
+DOUBLE = 2
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+# round a python float to the nearest C float, OverflowError if too big
+def toFloat(value):
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+
+# value and type of a number literal, None if it is an int too big for
+# an int (C would make it a long)
+def literal(text):
+    if text[-1] == 'f':
+        return toFloat(float(text[:-1])), FLOAT
+    if text.lstrip('-').isdigit():
+        value = int(text)
+        if value < INT_MIN or value > INT_MAX:
+            return None
+        return value, INT
+    return float(text), DOUBLE
+
+
+# literal text that C reads back as exactly this value and type
+def literalText(value, kind):
+    if kind == INT:
+        return str(value)
+    if kind == FLOAT:
+        return repr(value) + 'f'
+    return repr(value)
+
+
+# convert value to a wider type like C's usual arithmetic conversions, or a
+# double to a float the way storing it does, OverflowError if too big
+def convert(value, fromKind, toKind):
+    if fromKind == toKind or toKind == DOUBLE:
+        return value if toKind == INT else float(value)
+    result = toFloat(value)
+    # newer pythons round a double too big for a float to inf
+    if math.isinf(result) and not math.isinf(value):
+        raise OverflowError("too big for a float")
+    return result
+
+
+# work out left op right, None when C would trap, overflow or give inf/nan
+def arithmetic(op, left, leftKind, right, rightKind):
+    kind = max(leftKind, rightKind)
+    left = convert(left, leftKind, kind)
+    right = convert(right, rightKind, kind)
+    if op == '/' and right == 0:
+        return None
+
+    if kind == INT:
+        if op == '+':
+            value = left + right
+        elif op == '-':
+            value = left - right
+        elif op == '*':
+            value = left * right
+        else:
+            # C rounds int division toward zero
+            value = abs(left) // abs(right)
+            if (left < 0) != (right < 0):
+                value = -value
+        if value < INT_MIN or value > INT_MAX:
+            return None
+        return value, INT
+
+    if op == '+':
+        value = left + right
+    elif op == '-':
+        value = left - right
+    elif op == '*':
+        value = left * right
+    else:
+        value = left / right
+    if kind == FLOAT:
+        try:
+            value = toFloat(value)
+        except OverflowError:
+            return None
+    if not math.isfinite(value):
+        return None
+    return value, kind
+
+
+# -value or +value
+def unary(op, value, kind):
+    if op == '+':
+        return value, kind
+    if kind == INT and value == INT_MIN:
+        return None
+    return -value, kind
+
+
+# left op right for a comparison, C gives an int 1 or 0
+def compare(op, left, leftKind, right, rightKind):
+    kind = max(leftKind, rightKind)
+    left = convert(left, leftKind, kind)
+    right = convert(right, rightKind, kind)
+    if op == '==':
+        result = left == right
+    elif op == '!=':
+        result = left != right
+    elif op == '<':
+        result = left < right
+    elif op == '<=':
+        result = left <= right
+    elif op == '>':
+        result = left > right
+    else:
+        result = left >= right
+    return int(result), INT
+
+
+# C type of an expression or comparison in the generated code
+def typeOf(node):
+    kind = type(node)
+    if kind is Variable:
+        return FLOAT
+    if kind is Number:
+        value = literal(node.text)
+        return INT if value is None else value[1]
+    if kind is UnaryOp:
+        return typeOf(node.operand)
+    if kind is Comparison:
+        return INT
+    bottom, operations = chain(node)
+    result = typeOf(bottom)
+    for operation in operations:
+        result = INT if type(operation) is Comparison else max(result, typeOf(operation.right))
+    return result
@@ -0,0 +1,282 @@
+import json
+import struct
+import sys
+from array import array
+from .nodes import *
+from .runtime import *
+from .values import *
+
+# Bytecode and a stack machine to run it.
+# every instruction is two ints in an array('i'), the opcode and its
+# argument (0 when it doesn't take one), so the machine just steps by 2.
+# jumps hold the index of the instruction to go to
+
+# opcodes
+LOAD = 0        # push values[arg]
+CONST = 1       # push constants[arg]
+STORE = 2       # values[arg] = pop
+ADD = 3
+SUB = 4
+MUL = 5
+DIV = 6         # float division
+INTDIV = 7      # C int division
+NEG = 8
+ROUND = 9       # round the top to a C float
+EQ = 10
+NE = 11
+LT = 12
+LE = 13
+GT = 14
+GE = 15
+JUMP = 16       # go to arg
+JUMPFALSE = 17  # pop, go to arg if it is false
+PRINT = 18      # pop and print as a number
+PRINTSTR = 19   # print strings[arg]
+INPUT = 20      # read into values[arg]
+HALT = 21
+
+binaryOpcodes = {
+    '+': ADD, '-': SUB, '*': MUL,
+    '==': EQ, '!=': NE, '<': LT, '<=': LE, '>': GT, '>=': GE,
+}
+
+# file header, magic then format version
+MAGIC = b'TTBC'
+VERSION = 1
+
+
+# A compiled program, the code plus the tables its arguments index
+class Bytecode:
+    def __init__(self, code, constants, strings, names):
+        self.code = code
+        self.constants = constants
+        self.strings = strings
+        self.names = names
+
+    # write as magic, version, length of the tables as json, the tables and
+    # then the code as little endian int32s
+    def save(self, outputFile):
+        tables = json.dumps({
+            'constants': self.constants,
+            'strings': self.strings,
+            'names': self.names,
+        }).encode()
+        code = array('i', self.code)
+        if sys.byteorder == 'big':
+            code.byteswap()
+        outputFile.write(MAGIC + struct.pack('<II', VERSION, len(tables)))
+        outputFile.write(tables)
+        outputFile.write(code.tobytes())
+
+    @staticmethod
+    def load(inputFile):
+        if inputFile.read(4) != MAGIC:
+            raise ValueError("not a Teeny Tiny bytecode file")
+        version, size = struct.unpack('<II', inputFile.read(8))
+        if version != VERSION:
+            raise ValueError("unsupported bytecode version " + str(version))
+        tables = json.loads(inputFile.read(size))
+        code = array('i')
+        code.frombytes(inputFile.read())
+        if sys.byteorder == 'big':
+            code.byteswap()
+        return Bytecode(code, tables['constants'], tables['strings'], tables['names'])
+
+
+# Turns a syntax tree into Bytecode, doing the same C conversions and
+# float rounding the closure engine does
+class BytecodeCompiler:
+    def compile(self, program):
+        self.code = array('i')
+        self.constants = []
+        self.constantIndex = {}
+        self.strings = []
+        self.slots = {name: slot for slot, name in enumerate(program.symbols)}
+        self.labels = {}
+        self.gotos = []
+
+        self.block(program.statements)
+        self.emit(HALT)
+
+        # every label is known now
+        for position, name in self.gotos:
+            self.code[position + 1] = self.labels[name]
+        return Bytecode(self.code, self.constants, self.strings, list(program.symbols))
+
+    # add an instruction, returns where it is
+    def emit(self, opcode, argument=0):
+        self.code.append(opcode)
+        self.code.append(argument)
+        return len(self.code) - 2
+
+    def constant(self, value):
+        # 1 and 1.0 are different constants, as are 0.0 and -0.0
+        key = (type(value), repr(value))
+        if key not in self.constantIndex:
+            self.constantIndex[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constantIndex[key]
+
+    def block(self, statements):
+        for node in statements:
+            kind = type(node)
+            if kind is Let:
+                self.expression(node.expression, False)
+                self.emit(STORE, self.slots[node.name])
+            elif kind is Input:
+                self.emit(INPUT, self.slots[node.name])
+            elif kind is Print:
+                self.expression(node.expression, False)
+                self.emit(PRINT)
+            elif kind is PrintString:
+                self.strings.append(node.text + '\n')
+                self.emit(PRINTSTR, len(self.strings) - 1)
+            elif kind is Label:
+                self.labels[node.name] = len(self.code)
+            elif kind is Goto:
+                self.gotos.append((self.emit(JUMP), node.name))
+            elif kind is If:
+                self.expression(node.comparison)
+                skip = self.emit(JUMPFALSE)
+                self.block(node.body)
+                self.code[skip + 1] = len(self.code)
+            elif kind is While:
+                head = len(self.code)
+                self.expression(node.comparison)
+                exit = self.emit(JUMPFALSE)
+                self.block(node.body)
+                self.emit(JUMP, head)
+                self.code[exit + 1] = len(self.code)
+
+    # code that leaves the value of an expression or comparison on the
+    # stack. rounded=False skips the last float rounding when it is about
+    # to be stored or printed anyway
+    def expression(self, node, rounded=True):
+        kind = type(node)
+        if kind is Variable:
+            self.emit(LOAD, self.slots[node.name])
+        elif kind is Number:
+            self.emit(CONST, self.constant(self.number(node)))
+        elif kind is UnaryOp:
+            self.expression(node.operand, rounded)
+            if node.op == '-':
+                self.emit(NEG)
+        else:
+            # a step at a time up the chain, the left side is on the stack
+            # when each step's right side is pushed
+            bottom, operations = chain(node)
+            leftType = typeOf(bottom)
+            rightType = typeOf(operations[0].right)
+            # C converts both sides to the wider type first
+            self.operand(bottom, max(leftType, rightType))
+            for index, operation in enumerate(operations):
+                resultType = max(leftType, typeOf(operation.right))
+                if index and leftType == INT and resultType == FLOAT:
+                    self.emit(ROUND)
+                self.operand(operation.right, resultType)
+                if operation.op == '/':
+                    self.emit(INTDIV if resultType == INT else DIV)
+                else:
+                    self.emit(binaryOpcodes[operation.op])
+                last = index == len(operations) - 1
+                if resultType == FLOAT and (rounded or not last) and type(operation) is BinaryOp:
+                    self.emit(ROUND)
+                leftType = INT if type(operation) is Comparison else resultType
+
+    # an operand of an operation done in type
+    def operand(self, node, type):
+        if typeOf(node) == INT and type == FLOAT:
+            if isinstance(node, Number):
+                self.emit(CONST, self.constant(toFloat(self.number(node))))
+                return
+            self.expression(node)
+            self.emit(ROUND)
+        else:
+            self.expression(node)
+
+    # python value of a number literal, ints too big for C's int stay ints
+    def number(self, node):
+        value = literal(node.text)
+        return int(node.text) if value is None else value[0]
+
+
+# Runs Bytecode with a value stack
+class VirtualMachine:
+    def __init__(self, bytecode, input=sys.stdin, output=sys.stdout):
+        self.bytecode = bytecode
+        self.reader = InputReader(input)
+        self.write = output.write
+
+    def run(self):
+        code = self.bytecode.code
+        constants = self.bytecode.constants
+        strings = self.bytecode.strings
+        values = array('f', bytes(4 * len(self.bytecode.names)))
+        read = self.reader.input
+        write = self.write
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        # most common instructions first
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            if op == LOAD:
+                push(values[arg])
+            elif op == CONST:
+                push(constants[arg])
+            elif op == STORE:
+                values[arg] = pop()
+            elif op == JUMPFALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == ROUND:
+                stack[-1] = toFloat(stack[-1])
+            elif op == LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == DIV:
+                right = pop()
+                stack[-1] = divide(stack[-1], right)
+            elif op == INTDIV:
+                right = pop()
+                stack[-1] = intDivide(stack[-1], right)
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            elif op == PRINT:
+                write(formatNumber(pop()))
+            elif op == PRINTSTR:
+                write(strings[arg])
+            elif op == INPUT:
+                values[arg] = read(values[arg])
+            elif op == HALT:
+                return